@@ -1,2 +1,24 @@
 from .message_broadcaster import MessageBroadcaster
 from .text_broadcaster import TextBroadcaster
+from .rate_limiter import RateLimiter, TokenBucket
+from .progress import BaseProgressStore, FileProgressStore, SQLiteProgressStore
+from .multibot_broadcaster import MultiBotBroadcaster
+from .partitioned_broadcaster import PartitionedBroadcaster, run_worker
+from .rate_limiter import SharedRateLimiter
+from .work_queue import BaseWorkQueue, SQLiteWorkQueue
+from .metrics import BroadcastObserver, MetricsCollector, PrometheusObserver
+from .recipients import RecipientStore
+from .scheduler import BroadcastScheduler, ScheduledRateLimiter
+from .media_broadcaster import MediaBroadcaster
+from .file_id_cache import FileIdCache
+from .suppression import SuppressionIndex
+from .results import BaseResultSink, BroadcastResult, CallbackResultSink
+from .results import CSVResultSink, JSONLResultSink, SQLiteResultSink
+from .edit_broadcaster import EditBroadcaster
+from .delete_broadcaster import DeleteBroadcaster
+from .session import SessionConfig
+from .rendering import RenderPipeline, Renderer
+from .handle import BroadcastHandle, BroadcastProgress, shutdown_broadcasts
+from .album_broadcaster import AlbumBroadcaster
+from .dry_run import DryRunReport, SimulationModel
+from .delivery import DeliveredSet, DeliveryLog
@@ -0,0 +1,172 @@
+from string import Template
+from typing import Callable, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.types import (
+    InputMedia, InputMediaAudio, InputMediaDocument, InputMediaPhoto, InputMediaVideo, Message, ParseMode,
+)
+
+from .types import ChatsType, TextType, ChatIdType
+from .base import BaseBroadcaster
+from .delivery import DeliveryLog
+from .message_broadcaster import MessageBroadcaster
+from .metrics import BroadcastObserver
+from .progress import BaseProgressStore
+from .rate_limiter import RateLimiter
+from .rendering import RenderFunction, RenderPipeline, Renderer
+from .results import BaseResultSink
+from .session import SessionConfig
+from .suppression import SuppressionIndex
+
+# content type: (InputMedia class, file_id of the message)
+ALBUM_MEDIA: Dict[str, tuple] = {
+    'photo': (InputMediaPhoto, lambda message: message.photo[-1].file_id),
+    'video': (InputMediaVideo, lambda message: message.video.file_id),
+    'document': (InputMediaDocument, lambda message: message.document.file_id),
+    'audio': (InputMediaAudio, lambda message: message.audio.file_id),
+}
+MIN_ALBUM_SIZE = 2
+MAX_ALBUM_SIZE = 10
+# Rendered arguments sendMediaGroup accepts, besides the caption of the first item
+MEDIA_GROUP_ARGS = frozenset({
+    'message_thread_id', 'disable_notification', 'protect_content',
+    'reply_to_message_id', 'allow_sending_without_reply',
+})
+
+
+def _album_content_type(message: Message) -> str:
+    for content_type in ALBUM_MEDIA:
+        if getattr(message, content_type):
+            return content_type
+    raise ValueError('Albums can only contain photos, videos, documents or audio')
+
+
+class AlbumBroadcaster(BaseBroadcaster):
+    """
+    Broadcasts an album of 2-10 messages with a single ``sendMediaGroup`` call per chat.
+
+    ``messages`` are the items of the album, for example the messages of one
+    ``media_group_id`` collected by a handler. The caption of the first item is
+    a template, or ``caption`` when given; the other captions are sent as is.
+    Only the id of the first sent message is recorded, so ``EditBroadcaster``
+    and ``DeleteBroadcaster`` only reach the first item. ``render`` may return
+    the caption and the arguments of ``sendMediaGroup``, anything else (a
+    ``reply_markup`` for instance) is not supported by albums and is ignored.
+    """
+
+    def __init__(
+            self,
+            chats: ChatsType,
+            messages: List[Message],
+            caption: Optional[TextType] = None,
+            kwargs: Optional[Dict] = None,
+            disable_notification: Optional[bool] = None,
+            reply_to_message_id: Optional[int] = None,
+            allow_sending_without_reply: Optional[bool] = None,
+            bot: Optional[Bot] = None,
+            bot_token: Optional[str] = None,
+            timeout: Optional[float] = None,
+            concurrency: int = 1,
+            rate_limiter: Optional[RateLimiter] = None,
+            max_retries: int = 5,
+            progress_store: Optional[BaseProgressStore] = None,
+            observers: Optional[List[BroadcastObserver]] = None,
+            suppression_index: Optional[SuppressionIndex] = None,
+            result_sink: Optional[BaseResultSink] = None,
+            session_config: Optional[SessionConfig] = None,
+            render: Optional[RenderFunction] = None,
+            render_pipeline: Optional[RenderPipeline] = None,
+            campaign: Optional[str] = None,
+            delivery_log: Optional[DeliveryLog] = None,
+            duplicates: Optional[str] = 'first',
+            logger=__name__,
+    ):
+        self.check_album(messages)
+        super().__init__(
+            chats=chats,
+            kwargs=kwargs,
+            disable_notification=disable_notification,
+            reply_to_message_id=reply_to_message_id,
+            allow_sending_without_reply=allow_sending_without_reply,
+            bot=bot,
+            bot_token=bot_token,
+            timeout=timeout,
+            concurrency=concurrency,
+            rate_limiter=rate_limiter,
+            max_retries=max_retries,
+            progress_store=progress_store,
+            observers=observers,
+            suppression_index=suppression_index,
+            result_sink=result_sink,
+            session_config=session_config,
+            render_pipeline=render_pipeline,
+            campaign=campaign,
+            delivery_log=delivery_log,
+            duplicates=duplicates,
+            logger=logger,
+        )
+        self.messages = messages
+        self.media = [self.build_media(message) for message in messages]
+        first = messages[0]
+        first_media, get_file_id = ALBUM_MEDIA[_album_content_type(first)]
+        self._first_media: Callable[..., InputMedia] = first_media
+        self._first_file_id: str = get_file_id(first)
+
+        if caption is None:
+            template = MessageBroadcaster.compile_template(first)
+        else:
+            template = Template(caption) if isinstance(caption, str) else caption
+        if isinstance(template, Template):
+            self.renderer = Renderer({'caption': template}, render)
+        else:
+            self.renderer = Renderer({}, render)
+            if template is not None:
+                self.media[0] = self._first_media(
+                    media=self._first_file_id, caption=template, parse_mode=ParseMode.HTML,
+                )
+
+    @staticmethod
+    def check_album(messages: List[Message]) -> None:
+        if not MIN_ALBUM_SIZE <= len(messages) <= MAX_ALBUM_SIZE:
+            raise ValueError(f'An album must have from {MIN_ALBUM_SIZE} to {MAX_ALBUM_SIZE} items')
+        content_types = {_album_content_type(message) for message in messages}
+        # Photos and videos can be mixed, documents and audio only go with their own kind
+        if len(content_types) > 1 and not content_types <= {'photo', 'video'}:
+            raise ValueError('Documents and audio can not be mixed with other types in an album')
+        group_ids = {message.media_group_id for message in messages if message.media_group_id}
+        if len(group_ids) > 1:
+            raise ValueError('Messages belong to different media groups')
+
+    @staticmethod
+    def build_media(message: Message) -> InputMedia:
+        media_class, get_file_id = ALBUM_MEDIA[_album_content_type(message)]
+        caption = message.html_text if message.caption else None
+        return media_class(
+            media=get_file_id(message),
+            caption=caption,
+            parse_mode=ParseMode.HTML if caption else None,
+        )
+
+    async def _send(
+            self,
+            chat_id: ChatIdType,
+            chat_args: Dict,
+    ) -> Message:
+        return await self._send_rendered(chat_id, self.renderer(chat_args))
+
+    async def _send_rendered(self, chat_id: ChatIdType, payload: Dict) -> Message:
+        payload = dict(payload)
+        media: List[InputMedia] = self.media
+        if 'caption' in payload:
+            first = self._first_media(
+                media=self._first_file_id, caption=payload.pop('caption'), parse_mode=ParseMode.HTML,
+            )
+            media = [first, *self.media[1:]]
+        kwargs = {
+            'disable_notification': self.disable_notification,
+            'reply_to_message_id': self.reply_to_message_id,
+            'allow_sending_without_reply': self.allow_sending_without_reply,
+        }
+        kwargs.update((key, value) for key, value in payload.items() if key in MEDIA_GROUP_ARGS)
+        messages = await self.bot.send_media_group(chat_id=chat_id, media=media, **kwargs)
+        return messages[0]
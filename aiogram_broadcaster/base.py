@@ -1,16 +1,38 @@
 import abc
 import asyncio
+import functools
+import itertools
 import logging
-from typing import Dict, Optional, Tuple, List, Union
+import time
+import uuid
+from collections.abc import AsyncIterable, Iterable, Mapping
+from typing import AsyncIterator, Dict, FrozenSet, Hashable, Optional, Sequence, Tuple, List, Union
 
+import aiohttp
 from aiogram import Bot
+from aiogram.types import Message
+from aiogram.utils import exceptions
 
 from .types import ChatsType, MarkupType, ChatIdType
-from .exceptions import RunningError
+from .delivery import DeliveredSet, DeliveryLog
+from .dry_run import DryRunReport, SimulationModel, simulate
+from .handle import BroadcastHandle
+from .metrics import BroadcastObserver
+from .progress import BaseProgressStore
+from .rate_limiter import RateLimiter
+from .recipients import FAILED, SUCCESSFUL, RecipientStore
+from .rendering import RenderPipeline, Renderer
+from .results import BaseResultSink, BroadcastResult
+from .session import SessionConfig, close_session, configure_bot
+from .suppression import SuppressionIndex
+
+
+DUPLICATE_POLICIES = ('first', 'merge', None)
 
 
 class BaseBroadcaster(abc.ABC):
     running = []
+    _ids = itertools.count()
 
     def __init__(
             self,
@@ -23,9 +45,31 @@ class BaseBroadcaster(abc.ABC):
             reply_markup: MarkupType = None,
             bot: Optional[Bot] = None,
             bot_token: Optional[str] = None,
-            timeout: float = 0.05,
+            timeout: Optional[float] = None,
+            concurrency: int = 1,
+            rate_limiter: Optional[RateLimiter] = None,
+            max_retries: int = 5,
+            progress_store: Optional[BaseProgressStore] = None,
+            observers: Optional[List[BroadcastObserver]] = None,
+            suppression_index: Optional[SuppressionIndex] = None,
+            result_sink: Optional[BaseResultSink] = None,
+            session_config: Optional[SessionConfig] = None,
+            render_pipeline: Optional[RenderPipeline] = None,
+            campaign: Optional[str] = None,
+            delivery_log: Optional[DeliveryLog] = None,
+            duplicates: Optional[str] = 'first',
             logger=__name__,
     ):
+        # Subclasses override either ``_send`` or, as in older versions, ``send``
+        self._overrides_send = type(self).send is not BaseBroadcaster.send
+        if not self._overrides_send and type(self)._send is BaseBroadcaster._send:
+            raise TypeError(f"Can't instantiate {type(self).__name__} without a _send or send method")
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError(f'duplicates must be one of {DUPLICATE_POLICIES}')
+        # 'first' sends to the first occurrence of a chat id, 'merge' also
+        # updates its variables with those of later occurrences, None keeps all.
+        # On a stream both remember every chat id seen, pass None to skip that
+        self.duplicates = duplicates
         self._setup_chats(chats, kwargs)
         self.disable_notification = disable_notification
         self.disable_web_page_preview = disable_web_page_preview
@@ -34,55 +78,107 @@ class BaseBroadcaster(abc.ABC):
         self.reply_markup = reply_markup
         self._setup_bot(bot, bot_token)
         self.timeout = timeout
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(rate=1 / timeout) if timeout else RateLimiter()
+        self.rate_limiter = rate_limiter
+        if concurrency < 1:
+            raise ValueError('concurrency must be a positive integer')
+        self.concurrency = concurrency
+        # Bots created here get a pool sized for the concurrency, passed bots only when asked
+        if session_config is None and self._owns_bot:
+            session_config = SessionConfig()
+        if session_config is not None:
+            configure_bot(self.bot, session_config, concurrency)
+        self.session_config = session_config
+        if max_retries < 1:
+            raise ValueError('max_retries must be a positive integer')
+        self.max_retries = max_retries
+        self.progress_store = progress_store
+        self.observers = observers or []
+        self.suppression_index = suppression_index
+        self.result_sink = result_sink
+        self.render_pipeline = render_pipeline
+        if delivery_log is not None:
+            if not campaign:
+                raise AttributeError('You should pass a campaign to use a delivery_log')
+            # Checks the campaign key
+            delivery_log.path(campaign)
+        # Stable key of the campaign, chats it reached are skipped by later runs
+        self.campaign = campaign
+        self.delivery_log = delivery_log
+        self._delivered: Optional[DeliveredSet] = None
+        self._already_delivered = 0
+        # Set by broadcasters that can render their payloads ahead
+        self.renderer: Optional[Renderer] = None
 
         if not isinstance(logger, logging.Logger):
             logger = logging.getLogger(logger)
 
         self.logger = logger
 
-        self._id: int = len(BaseBroadcaster.running)
+        self._id: int = next(BaseBroadcaster._ids)
+        # Unique across processes, unlike _id, and renewed by every run
+        self.run_id: str = uuid.uuid4().hex
         self._is_running: bool = False
-        self._successful: List[Dict] = []
-        self._failure: List[Dict] = []
+        self._paused: bool = False
+        self._unpaused: Optional[asyncio.Event] = None
+        self._stopping: bool = False
 
     def __str__(self) -> str:
         attributes = [
             ('id', self._id),
             ('is_running', self._is_running),
         ]
+        if self._paused:
+            attributes.append(('is_paused', True))
         if self._is_running:
-            attributes.append(('progress', f'{len(self.successful)}/{len(self.chats)}'))
+            total = len(self.recipients) if self._source is None else '?'
+            attributes.append(('progress', f'{self.recipients.count(SUCCESSFUL)}/{total}'))
         attributes = '; '.join((f'{key}={str(value)}' for key, value in attributes))
         return f'<{self.__class__.__name__}({attributes})>'
 
+    @property
+    def chats(self) -> Union[List[Dict], ChatsType]:
+        if self._source is not None:
+            return self._source
+        return [self.recipients.chat(index) for index in range(len(self.recipients))]
+
     @property
     def successful(self) -> List[Dict]:
-        if not self._is_running:
-            raise RunningError(self._is_running)
-        else:
-            return self._successful
+        return self.recipients.chats(SUCCESSFUL)
 
-    def get_successful(self, id_only: bool = False) -> Union[List[Dict], List[ChatIdType]]:
+    def get_successful(self, id_only: bool = False) -> Union[List[Dict], Sequence[ChatIdType]]:
         if id_only:
-            return [chat['chat_id'] for chat in self.successful]
+            return self.recipients.ids(SUCCESSFUL)
         else:
             return self.successful
 
     @property
     def failure(self) -> List[Dict]:
-        return self._failure
+        return self.recipients.chats(FAILED)
 
-    def get_failure(self, id_only: bool = False) -> Union[List[Dict], List[ChatIdType]]:
+    def get_failure(self, id_only: bool = False) -> Union[List[Dict], Sequence[ChatIdType]]:
         if id_only:
-            return [chat['chat_id'] for chat in self.failure]
+            return self.recipients.ids(FAILED)
         else:
             return self.failure
 
+    def get_sent_messages(self) -> List[Dict]:
+        """
+        Sent messages as ``{'chat_id': ..., 'message_id': ...}``,
+        ready to be passed as chats to an EditBroadcaster or DeleteBroadcaster
+        """
+        return [
+            {'chat_id': chat_id, 'message_id': message_id}
+            for chat_id, message_id in self.recipients.sent_messages()
+        ]
+
     def _setup_bot(
             self,
             bot: Optional[Bot] = None,
             token: Optional[str] = None,
     ) -> Bot:
+        self._owns_bot = bool(token) and not bot
         if not (bot or token):
             bot = Bot.get_current()
             if bot:
@@ -101,37 +197,81 @@ class BaseBroadcaster(abc.ABC):
     def _setup_chats(self, chats: ChatsType, kwargs: Optional[Dict] = None) -> None:
         if not kwargs:
             kwargs = {}
+        self.recipients = RecipientStore(kwargs)
+        self._source: Optional[ChatsType] = None
+        self._chat_keys: Optional[FrozenSet] = None
+        # Chat id -> index of the chats seen so far, None when duplicates are kept
+        self._seen: Optional[Dict[ChatIdType, int]] = None if self.duplicates is None else {}
+        # Chats dropped or merged by the duplicates policy
+        self._duplicate_count = 0
         if isinstance(chats, int) or isinstance(chats, str):
-            self.chats = [{'chat_id': chats, **kwargs}]
+            self.recipients.append(chats)
         elif isinstance(chats, list):
-            if all([
-                isinstance(chat, int) or isinstance(chat, str)
-                for chat in chats
-            ]):
-                self.chats = [
-                    {'chat_id': chat, **kwargs} for chat in chats
-                ]
-            elif all([
-                isinstance(chat, dict)
-                for chat in chats
-            ]):
-                if not all([chat.get('chat_id') for chat in chats]):
-                    raise ValueError('Not all dictionaries have the "chat_id" key')
-                if not self._chek_identical_keys(dicts=chats):
-                    raise ValueError('Not all dictionaries have identical keys')
-                self.chats = [
-                    {'chat_id': chat.pop('chat_id'), **chat, **kwargs}
-                    for chat in chats if chat.get('chat_id', None)
-                ]
+            if all(isinstance(chat, (int, str)) for chat in chats):
+                self.recipients.extend(chats if self.duplicates is None else list(dict.fromkeys(chats)))
+                self._duplicate_count = len(chats) - len(self.recipients)
+            else:
+                for chat in chats:
+                    self._append_chat(chat)
+            # Only streams need to remember what was seen
+            self._seen = None
+        elif isinstance(chats, (Iterable, AsyncIterable)) and not isinstance(chats, (Mapping, bytes)):
+            # Streams are validated item by item while the broadcast consumes them
+            self._source = chats
         else:
             raise AttributeError(f'argument chats: expected {ChatsType}, got "{type(chats)}"')
 
-    @staticmethod
-    def _chek_identical_keys(dicts: List) -> bool:
-        for d in dicts[1:]:
-            if not sorted(d.keys()) == sorted(dicts[0].keys()):
-                return False
-        return True
+    def _append_chat(self, chat: Union[ChatIdType, Dict]) -> Optional[int]:
+        """
+        Validate a chat and add it to the recipient store, in a single pass
+        and without modifying it. Returns its index, None for a duplicate
+        """
+        if isinstance(chat, int) or isinstance(chat, str):
+            chat_id, variables = chat, None
+        elif isinstance(chat, dict):
+            chat_id = chat.get('chat_id')
+            if not chat_id:
+                raise ValueError('Not all dictionaries have the "chat_id" key')
+            keys = frozenset(chat)
+            if self._chat_keys is None:
+                self._chat_keys = keys
+            elif keys != self._chat_keys:
+                raise ValueError('Not all dictionaries have identical keys')
+            variables = chat
+        else:
+            raise ValueError(f'Chat must be a chat id or a dictionary, got "{type(chat)}"')
+
+        if self._seen is None:
+            return self.recipients.append(chat_id, variables)
+        index = self._seen.get(chat_id)
+        if index is not None:
+            if self.duplicates == 'merge' and variables:
+                self.recipients.update(index, variables)
+            self._duplicate_count += 1
+            return None
+        index = self._seen[chat_id] = self.recipients.append(chat_id, variables)
+        return index
+
+    async def _iter_chats(self) -> AsyncIterator[int]:
+        """Indices of the chats in the recipient store, streams are appended as they are consumed"""
+        if self._source is None:
+            for index in range(len(self.recipients)):
+                yield index
+        elif isinstance(self._source, AsyncIterable):
+            async for chat in self._source:
+                index = self._append_chat(chat)
+                if index is not None:
+                    yield index
+        else:
+            for chat in self._source:
+                index = self._append_chat(chat)
+                if index is not None:
+                    yield index
+
+    def _require_variable(self, key: str) -> None:
+        """Check that every chat passed as a list has ``key``, streams are not checked ahead"""
+        if self._source is None and len(self.recipients) and not self.recipients.has_variable(key):
+            raise ValueError(f'Not all dictionaries have the "{key}" key')
 
     @staticmethod
     def _parse_args(chat: Dict) -> Tuple[ChatIdType, dict]:
@@ -139,9 +279,136 @@ class BaseBroadcaster(abc.ABC):
         text_args = chat
         return chat_id, text_args
 
-    @abc.abstractmethod
+    async def _send(self, chat_id: ChatIdType, chat_args: dict) -> Message:
+        """
+        Send one message, retries and errors are handled by ``_deliver``.
+        Subclasses written for older versions may override ``send`` instead,
+        it is then called as is and has to handle errors itself
+        """
+        raise NotImplementedError
+
+    def _notify(self, event: str, *args) -> None:
+        for observer in self.observers:
+            getattr(observer, event)(self, *args)
+
+    async def _send_rendered(self, chat_id: ChatIdType, payload: Dict) -> Message:
+        """Send with the arguments produced by ``self.renderer``, needed by the render pipeline"""
+        raise NotImplementedError
+
     async def send(self, chat_id: ChatIdType, chat_args: dict) -> bool:
-        pass
+        success, _ = await self._deliver(chat_id, chat_args)
+        return success
+
+    async def _deliver(
+            self,
+            chat_id: ChatIdType,
+            chat_args: dict,
+            payload: Optional[Dict] = None,
+    ) -> Tuple[bool, Optional[int]]:
+        """
+        Send with retries, returns whether it succeeded and the id of the sent message if any.
+        A pre-rendered ``payload`` is sent as is
+        """
+        if self.suppression_index is not None and self.suppression_index.is_suppressed(self.bot.id, chat_id):
+            self.logger.debug("Target [ID:%s]: suppressed", chat_id)
+            if self.result_sink is not None:
+                self.result_sink.record(BroadcastResult(self.run_id, self.campaign, chat_id, None, 'Suppressed', 0.0))
+            return False, None
+        if self._overrides_send:
+            await self.rate_limiter.acquire(chat_id)
+            return await self.send(chat_id, chat_args), None
+        for attempt in range(1, self.max_retries + 1):
+            await self.rate_limiter.acquire(chat_id)
+            started = time.perf_counter()
+            try:
+                if payload is None:
+                    message = await self._send(chat_id=chat_id, chat_args=chat_args)
+                else:
+                    message = await self._send_rendered(chat_id, payload)
+            except exceptions.RetryAfter as e:
+                self.logger.debug(
+                    "Target [ID:%s]: Flood limit is exceeded. Sleep %s seconds. Attempt %s/%s.",
+                    chat_id, e.timeout, attempt, self.max_retries,
+                )
+                self.rate_limiter.on_retry_after(e.timeout)
+                if self.observers:
+                    self._notify('on_retry_after', chat_id, e.timeout)
+                error = e
+            except (
+                    exceptions.BotBlocked,
+                    exceptions.ChatNotFound,
+                    exceptions.UserDeactivated,
+            ) as e:
+                self.logger.debug("Target [ID:%s]: %s", chat_id, e.match)
+                if self.suppression_index is not None:
+                    await self.suppression_index.add(self.bot.id, chat_id, e.__class__.__name__)
+                error = e
+                break
+            except (asyncio.TimeoutError, exceptions.NetworkError) as e:
+                error = e
+                # Only a failed connection proves the request never reached Telegram,
+                # after a read timeout sending again could deliver the message twice
+                if not isinstance(e.__context__, aiohttp.ClientConnectorError):
+                    self.logger.warning("Target [ID:%s]: %r, the request may have arrived", chat_id, e)
+                    break
+                self.logger.debug(
+                    "Target [ID:%s]: %r. Attempt %s/%s.", chat_id, e, attempt, self.max_retries,
+                )
+            except exceptions.TelegramAPIError as e:
+                self.logger.exception("Target [ID:%s]: failed", chat_id)
+                error = e
+                break
+            else:
+                latency = time.perf_counter() - started
+                self.rate_limiter.on_success()
+                if self.suppression_index is not None:
+                    await self.suppression_index.discard(self.bot.id, chat_id)
+                if self.observers:
+                    self._notify('on_sent', chat_id, latency)
+                message_id = getattr(message, 'message_id', None)
+                if self.result_sink is not None:
+                    self.result_sink.record(BroadcastResult(
+                        self.run_id, self.campaign, chat_id, message_id, None, latency,
+                    ))
+                self.logger.debug("Target [ID:%s]: success", chat_id)
+                return True, message_id
+        else:
+            self.logger.warning(
+                "Target [ID:%s]: still failing after %s attempts: %r", chat_id, self.max_retries, error,
+            )
+        latency = time.perf_counter() - started
+        if self.observers:
+            self._notify('on_failed', chat_id, error, latency)
+        if self.result_sink is not None:
+            self.result_sink.record(BroadcastResult(
+                self.run_id, self.campaign, chat_id, None, error.__class__.__name__, latency,
+            ))
+        return False, None
+
+    @property
+    def is_paused(self) -> bool:
+        return self._paused
+
+    def pause(self) -> None:
+        """Stop taking new chats, sends already in flight are completed"""
+        self._paused = True
+        if self._unpaused is not None:
+            self._unpaused.clear()
+
+    def unpause(self) -> None:
+        self._paused = False
+        if self._unpaused is not None:
+            self._unpaused.set()
+
+    @property
+    def is_stopping(self) -> bool:
+        return self._stopping
+
+    def stop(self) -> None:
+        """Take no new chats, sends in flight are completed and the progress is flushed"""
+        self._stopping = True
+        # Workers waiting for an unpause pick up their chat and exit
+        self.unpause()
 
     def _change_running_status(self, run: bool) -> None:
         self._is_running = run
@@ -150,22 +417,187 @@ class BaseBroadcaster(abc.ABC):
         else:
             BaseBroadcaster.running.remove(self)
 
-    async def _start_broadcast(self) -> None:
-        for chat in self.chats:
-            logging.info(str(self))
-            chat_id, chat_args = self._parse_args(chat)
-            if await self.send(chat_id=chat_id, chat_args=chat_args):
-                self._successful.append(chat)
+    async def _process_chat(self, index: int, payload: Optional[Dict] = None) -> None:
+        if self._paused:
+            await self._unpaused.wait()
+        chat_id, chat_args = self._parse_args(self.recipients.chat(index))
+        success, message_id = await self._deliver(chat_id, chat_args, payload)
+        self.recipients.set_status(index, SUCCESSFUL if success else FAILED)
+        if message_id:
+            self.recipients.set_message_id(index, message_id)
+        if success and self._delivered is not None:
+            await self.delivery_log.record(self.campaign, self._delivered, self._delivery_key(index))
+        if self.progress_store is not None:
+            await self.progress_store.record(self._progress_key(index), success)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            if self.observers:
+                self._notify('on_queue_depth', queue.qsize())
+            await self._process_chat(*job)
+
+    async def _produce(self, chats: AsyncIterator[Tuple[int, Optional[Dict]]], queue: asyncio.Queue) -> None:
+        async for job in chats:
+            if self._stopping:
+                break
+            await queue.put(job)
+        for _ in range(self.concurrency):
+            await queue.put(None)
+
+    async def _render_ahead(self, chats: AsyncIterator[int]) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+        """Pair chats with their payload, rendered by the pipeline if there is one"""
+        if self.render_pipeline is None:
+            async for index in chats:
+                yield index, None
+            return
+
+        async def with_args() -> AsyncIterator[Tuple[int, Dict]]:
+            async for index in chats:
+                yield index, self._parse_args(self.recipients.chat(index))[1]
+
+        async for job in self.render_pipeline.stream(self.renderer, with_args()):
+            yield job
+
+    async def _start_broadcast(self, chats: AsyncIterator[Tuple[int, Optional[Dict]]]) -> None:
+        if self.concurrency == 1:
+            async for job in chats:
+                if self._stopping:
+                    break
+                await self._process_chat(*job)
+            return
+
+        # A bounded queue keeps memory constant however long the source is
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        tasks = [asyncio.ensure_future(self._produce(chats, queue))]
+        tasks.extend(
+            asyncio.ensure_future(self._worker(queue))
+            for _ in range(self.concurrency)
+        )
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _progress_key(self, index: int) -> Hashable:
+        """Key of a chat in the progress store, unique among the chats of the broadcast"""
+        return self.recipients.chat_ids[index]
+
+    async def _skip_done(self, done: Dict[Hashable, bool]) -> AsyncIterator[int]:
+        async for index in self._iter_chats():
+            success = done.get(self._progress_key(index))
+            if success is None:
+                yield index
             else:
-                self._failure.append(chat)
-            await asyncio.sleep(self.timeout)
+                self.recipients.set_status(index, SUCCESSFUL if success else FAILED)
 
-    async def run(self) -> None:
+    def _delivery_key(self, index: int) -> ChatIdType:
+        """Key of a chat in the delivered set of the campaign"""
+        return self.recipients.chat_ids[index]
+
+    async def _skip_delivered(self, chats: AsyncIterator[int]) -> AsyncIterator[int]:
+        """Pass over the chats previous runs of the campaign reached, they count as successful"""
+        self._already_delivered = 0
+        # Saving replaces the array of the set, this one keeps only what was loaded
+        # and a chat repeated in this run is not taken for one reached before
+        reached = DeliveredSet()
+        reached.chat_ids = self._delivered.chat_ids
+        async for index in chats:
+            if self._delivery_key(index) in reached:
+                self.recipients.set_status(index, SUCCESSFUL)
+                self._already_delivered += 1
+            else:
+                yield index
+        if self._already_delivered:
+            self.logger.info(f'{self._already_delivered} chats already reached by {self.campaign} were skipped')
+
+    async def _flush_stores(self) -> None:
+        """Write out what the stores buffered, a failing store does not keep the others from it"""
+        steps = []
+        if self.result_sink is not None:
+            steps.append(('result sink', self.result_sink.stop))
+        if self.progress_store is not None:
+            steps.append(('progress store', self.progress_store.flush))
+        if self.suppression_index is not None:
+            steps.append(('suppression index', self.suppression_index.flush))
+        if self._delivered is not None:
+            steps.append(('delivery log', functools.partial(self.delivery_log.save, self.campaign, self._delivered)))
+        for name, step in steps:
+            try:
+                await step()
+            except Exception:
+                self.logger.exception(f'Broadcast {self._id}: could not flush the {name}')
+
+    async def _run(self, chats: AsyncIterator[int]) -> None:
+        if self.render_pipeline is not None and self.renderer is None:
+            raise AttributeError(f'{self.__class__.__name__} does not support a render pipeline')
+        self.run_id = uuid.uuid4().hex
+        # Created here to bind it to the running loop
+        self._unpaused = asyncio.Event()
+        if not self._paused:
+            self._unpaused.set()
+        if self.suppression_index is not None and not self.suppression_index.is_loaded:
+            await asyncio.get_event_loop().run_in_executor(None, self.suppression_index.load)
+        if self.delivery_log is not None:
+            self._delivered = await self.delivery_log.load(self.campaign)
+            chats = self._skip_delivered(chats)
+        if self.result_sink is not None:
+            self.result_sink.start()
         self._change_running_status(True)
-        await self._start_broadcast()
-        self._change_running_status(False)
-        logging.info(f'{len(self._successful)}/{len(self.chats)} messages were sent out')
+        try:
+            await self._start_broadcast(self._render_ahead(chats))
+        finally:
+            try:
+                await self._flush_stores()
+            finally:
+                self._stopping = False
+                self._change_running_status(False)
+        successful = self.recipients.count(SUCCESSFUL)
+        total = successful + self.recipients.count(FAILED)
+        self.logger.info(f'{successful}/{total} messages were sent out')
+
+    async def run(self) -> None:
+        await self._run(self._iter_chats())
+
+    async def resume(self) -> None:
+        """
+        Continue a broadcast recorded in the progress store,
+        skipping every chat that already has an outcome
+        """
+        if self.progress_store is None:
+            raise AttributeError('You should pass a progress_store to resume a broadcast')
+        done = await self.progress_store.load()
+        await self._run(self._skip_done(done))
+
+    async def dry_run(self, model: Optional[SimulationModel] = None, trace_memory: bool = True) -> DryRunReport:
+        """
+        Run the whole broadcast, rendering and send plans included, against a
+        simulated Bot API and clock: nothing is sent and no store is written.
+        Reports the simulated duration, the calls per Bot API method, the
+        render CPU time and the peak memory traced by ``tracemalloc``.
+        Per-chat rate limits are not simulated, and a stream of chats is
+        consumed by the dry run
+        """
+        return await simulate(self, model, trace_memory)
+
+    def start(self, resume: bool = False) -> BroadcastHandle:
+        """
+        Run the broadcast in the background, e.g. from a message handler,
+        ``resume`` continues it from the progress store
+        """
+        return BroadcastHandle(self, asyncio.ensure_future(self.resume() if resume else self.run()))
 
     async def close_bot(self) -> None:
         logging.warning('GOODBYE')
-        await self.bot.session.close()
+        await close_session(self.bot)
+
+    async def __aenter__(self) -> 'BaseBroadcaster':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        """Close the bot session, unless the bot was passed in and belongs to the caller"""
+        if self._owns_bot:
+            await close_session(self.bot)
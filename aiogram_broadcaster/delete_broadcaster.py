@@ -0,0 +1,74 @@
+from typing import Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.utils import exceptions
+
+from .types import ChatsType, ChatIdType
+from .delivery import DeliveryLog
+from .metrics import BroadcastObserver
+from .progress import BaseProgressStore
+from .rate_limiter import RateLimiter
+from .results import BaseResultSink
+from .sent_message_broadcaster import SentMessageBroadcaster
+from .session import SessionConfig
+from .suppression import SuppressionIndex
+
+
+class DeleteBroadcaster(SentMessageBroadcaster):
+    """
+    Deletes previously sent messages, every chat needs a ``message_id``
+    (see ``get_sent_messages``). A message that is already gone counts as deleted.
+    """
+
+    def __init__(
+            self,
+            chats: ChatsType,
+            kwargs: Optional[Dict] = None,
+            bot: Optional[Bot] = None,
+            bot_token: Optional[str] = None,
+            timeout: Optional[float] = None,
+            concurrency: int = 1,
+            rate_limiter: Optional[RateLimiter] = None,
+            max_retries: int = 5,
+            progress_store: Optional[BaseProgressStore] = None,
+            observers: Optional[List[BroadcastObserver]] = None,
+            suppression_index: Optional[SuppressionIndex] = None,
+            result_sink: Optional[BaseResultSink] = None,
+            session_config: Optional[SessionConfig] = None,
+            campaign: Optional[str] = None,
+            delivery_log: Optional[DeliveryLog] = None,
+            duplicates: Optional[str] = None,
+            logger=__name__,
+    ):
+        super().__init__(
+            chats=chats,
+            kwargs=kwargs,
+            bot=bot,
+            bot_token=bot_token,
+            timeout=timeout,
+            concurrency=concurrency,
+            rate_limiter=rate_limiter,
+            max_retries=max_retries,
+            progress_store=progress_store,
+            observers=observers,
+            suppression_index=suppression_index,
+            result_sink=result_sink,
+            session_config=session_config,
+            campaign=campaign,
+            delivery_log=delivery_log,
+            duplicates=duplicates,
+            logger=logger,
+        )
+        self._require_variable('message_id')
+
+    async def _send(
+            self,
+            chat_id: ChatIdType,
+            chat_args: Dict,
+    ) -> bool:
+        message_id = chat_args['message_id']
+        try:
+            return await self.bot.delete_message(chat_id=chat_id, message_id=message_id)
+        except exceptions.MessageToDeleteNotFound:
+            self.logger.debug("Target [ID:%s]: message %s is already deleted", chat_id, message_id)
+            return True
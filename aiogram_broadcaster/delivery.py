@@ -0,0 +1,162 @@
+import asyncio
+import contextlib
+import heapq
+import os
+import re
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+from .types import ChatIdType
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CAMPAIGN_PATTERN = re.compile(r'^[\w.-]+$')
+
+
+class DeliveredSet:
+    """
+    Chat ids a campaign has reached: a sorted ``array('q')`` of 8 bytes per
+    chat, searched by bisection, plus the chats reached since it was saved.
+    Only int64 keys are recorded, usernames are always sent to
+    """
+
+    def __init__(self, chat_ids: Iterable[int] = ()):
+        self.chat_ids = array('q', sorted(set(chat_ids)))
+        self.new: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.chat_ids) + len(self.new)
+
+    def __contains__(self, chat_id: ChatIdType) -> bool:
+        if not isinstance(chat_id, int):
+            return False
+        if chat_id in self.new:
+            return True
+        position = bisect_left(self.chat_ids, chat_id)
+        return position < len(self.chat_ids) and self.chat_ids[position] == chat_id
+
+    def add(self, chat_id: ChatIdType) -> None:
+        if isinstance(chat_id, int) and chat_id not in self:
+            self.new.add(chat_id)
+
+
+class DeliveryLog:
+    """
+    Persistent delivered sets, one file per campaign in ``directory``.
+
+    A broadcaster given a ``campaign`` key and a delivery log skips the chats
+    the campaign already reached, so re-running an announcement only sends
+    to the chats added since. Files hold sorted int64 chat ids; saving merges
+    with the file on disk under an exclusive ``flock``, so processes sharing
+    a campaign keep each other's chats (on platforms without ``fcntl`` only
+    threads of one process are serialized). Chats reached during a broadcast
+    are saved every ``batch_size`` chats or ``save_interval`` seconds, so a
+    crash does not make the next run send to them again.
+    """
+
+    def __init__(self, directory: str, batch_size: int = 1000, save_interval: float = 1.0):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.save_interval = save_interval
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+        self._save_lock: Optional[asyncio.Lock] = None
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_save_lock'] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def path(self, campaign: str) -> str:
+        if not CAMPAIGN_PATTERN.match(campaign):
+            raise ValueError('campaign may only contain letters, digits, "_", "-" and "."')
+        return os.path.join(self.directory, f'{campaign}.delivered')
+
+    def _read(self, campaign: str) -> array:
+        chat_ids = array('q')
+        path = self.path(campaign)
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                chat_ids.frombytes(file.read())
+        return chat_ids
+
+    @contextlib.contextmanager
+    def _file_lock(self, campaign: str) -> Iterator[None]:
+        """Serialize the saves of every process sharing the directory"""
+        if fcntl is None:
+            yield
+            return
+        with open(f'{self.path(campaign)}.lock', 'a') as file:
+            # Released when the file is closed
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _load(self, campaign: str) -> DeliveredSet:
+        delivered = DeliveredSet()
+        # Saved sorted, no need to sort again
+        delivered.chat_ids = self._read(campaign)
+        return delivered
+
+    def _save(self, campaign: str, new: Set[int]) -> array:
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, self._file_lock(campaign):
+            # Re-read to keep the chats other processes saved meanwhile
+            saved = DeliveredSet()
+            saved.chat_ids = self._read(campaign)
+            merged = array('q', heapq.merge(saved.chat_ids, sorted(i for i in new if i not in saved)))
+            fd, tmp_path = tempfile.mkstemp(prefix=f'{campaign}.', suffix='.tmp', dir=self.directory)
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    merged.tofile(file)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp_path, self.path(campaign))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        return merged
+
+    async def load(self, campaign: str) -> DeliveredSet:
+        return await asyncio.get_event_loop().run_in_executor(None, self._load, campaign)
+
+    async def record(self, campaign: str, delivered: DeliveredSet, chat_id: ChatIdType) -> None:
+        """Add a reached chat to the set, saving it when a batch is due"""
+        delivered.add(chat_id)
+        if (
+                len(delivered.new) >= self.batch_size
+                or time.monotonic() - self._last_save >= self.save_interval
+        ):
+            await self.save(campaign, delivered)
+
+    async def save(self, campaign: str, delivered: DeliveredSet) -> None:
+        """Write the chats reached since the set was saved"""
+        if self._save_lock is None:
+            self._save_lock = asyncio.Lock()
+        async with self._save_lock:
+            self._last_save = time.monotonic()
+            if not delivered.new:
+                return
+            # Chats keep being added while the batch is written
+            new = set(delivered.new)
+            merged = await asyncio.get_event_loop().run_in_executor(None, self._save, campaign, new)
+            delivered.chat_ids = merged
+            delivered.new.difference_update(new)
+
+    def clear(self, campaign: str) -> None:
+        """Forget every chat the campaign reached"""
+        path = self.path(campaign)
+        if os.path.exists(path):
+            with self._lock, self._file_lock(campaign):
+                os.remove(path)
@@ -0,0 +1,306 @@
+import copy
+import heapq
+import random
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Union
+
+from aiogram import Bot
+from aiogram.utils import exceptions
+
+from .delivery import DeliveredSet, DeliveryLog
+from .file_id_cache import FileIdCache
+from .progress import BaseProgressStore
+from .rate_limiter import RateLimiter
+from .recipients import FAILED, SUCCESSFUL
+from .rendering import Renderer
+from .results import BaseResultSink
+from .send_plan import SendPlan
+from .suppression import SuppressionIndex
+from .types import ChatIdType
+
+if TYPE_CHECKING:
+    from .base import BaseBroadcaster
+
+# Stores written by a broadcast, left untouched by a dry run
+PERSISTENT_STORES = (BaseProgressStore, BaseResultSink, FileIdCache)
+MEDIA_FIELDS = ('photo', 'video', 'animation', 'document', 'audio', 'voice', 'video_note', 'sticker')
+
+
+class SimulationModel(NamedTuple):
+    """
+    How the simulated Bot API behaves: ``latency`` seconds per call, give or
+    take ``jitter`` seconds, and the share of calls answered with a
+    ``RetryAfter`` of ``retry_after`` seconds or with ``BotBlocked``.
+    ``rate`` overrides the global rate of the broadcaster's limiter
+    """
+    latency: float = 0.1
+    jitter: float = 0.0
+    rate: Optional[float] = None
+    retry_after_rate: float = 0.0
+    retry_after: int = 5
+    blocked_rate: float = 0.0
+    seed: Optional[int] = 0
+
+
+class DryRunReport(NamedTuple):
+    recipients: int
+    # Dropped or merged by the duplicates policy
+    duplicates: int
+    suppressed: int
+    # Skipped, the campaign reached them before
+    already_delivered: int
+    successful: int
+    failed: int
+    retries: int
+    # Bot API method -> number of calls
+    calls: Dict[str, int]
+    # Simulated duration of the broadcast, in seconds
+    eta: float
+    renders: int
+    render_cpu: float
+    cpu_time: float
+    peak_memory: Optional[int]
+
+
+class SimulatedClock:
+    """
+    Schedules the calls of one bot on simulated time: a call starts once a
+    worker is free, the global rate allows it and no flood wait is pending
+    """
+
+    def __init__(self, model: SimulationModel, rng: random.Random, concurrency: int, limiter: RateLimiter):
+        self.model = model
+        self.rng = rng
+        self.limiter = limiter
+        self.max_rate = model.rate if model.rate is not None else getattr(limiter, 'rate', None)
+        self.rate = self.max_rate
+        self.workers = [0.0] * concurrency
+        self.next_slot = 0.0
+        self.paused_until = 0.0
+        self.end = 0.0
+        self.calls: Counter = Counter()
+        self.flood_waits = 0
+
+    def _adapt(self, flooded: bool) -> None:
+        if not self.rate or not getattr(self.limiter, 'adaptive', False):
+            return
+        if flooded:
+            self.rate = max(self.limiter.min_rate, self.rate * self.limiter.decrease_factor)
+        elif self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.limiter.rate_increase / self.rate)
+
+    async def request(self, method: str, data: Optional[Dict] = None, files: Optional[Dict] = None, **kwargs):
+        """Stand-in for ``Bot.request``"""
+        self.calls[method] += 1
+        start = max(heapq.heappop(self.workers), self.next_slot, self.paused_until)
+        if self.rate:
+            self.next_slot = start + 1 / self.rate
+        latency = self.model.latency + self.rng.uniform(-self.model.jitter, self.model.jitter)
+        finish = start + max(0.0, latency)
+        heapq.heappush(self.workers, finish)
+        self.end = max(self.end, finish)
+
+        chance = self.rng.random()
+        if chance < self.model.retry_after_rate:
+            self.paused_until = max(self.paused_until, finish + self.model.retry_after)
+            self._adapt(True)
+            self.flood_waits += 1
+            raise exceptions.RetryAfter(self.model.retry_after)
+        if chance < self.model.retry_after_rate + self.model.blocked_rate:
+            raise exceptions.BotBlocked('Forbidden: bot was blocked by the user')
+        self._adapt(False)
+        return self.response(method, data or {}, files or {})
+
+    @staticmethod
+    def response(method: str, data: Dict, files: Dict) -> Union[Dict, List[Dict], bool]:
+        if method == 'deleteMessage':
+            return True
+        message = {'message_id': 1, 'date': 0, 'chat': {'id': data.get('chat_id'), 'type': 'private'}}
+        for field in MEDIA_FIELDS:
+            if field in data or field in files:
+                media = {'file_id': 'dry-run', 'file_unique_id': 'dry-run', 'width': 0, 'height': 0}
+                message[field] = [media] if field == 'photo' else media
+        if method == 'sendMediaGroup':
+            return [message]
+        return message
+
+
+class _SimulatedRateLimiter(RateLimiter):
+    """Lets every call through, waits are accounted by the SimulatedClock"""
+
+    def __init__(self):
+        super().__init__(rate=None, chat_rate=None, group_rate=None)
+
+    def on_retry_after(self, timeout: float) -> None:
+        pass
+
+
+class _ReadOnlySuppression:
+    """Answers from a suppression index without recording anything in it"""
+
+    def __init__(self, index: SuppressionIndex):
+        self.index = index
+        self.suppressed = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.index.is_loaded
+
+    def load(self) -> None:
+        self.index.load()
+
+    def is_suppressed(self, bot_id: int, chat_id: ChatIdType) -> bool:
+        suppressed = self.index.is_suppressed(bot_id, chat_id)
+        self.suppressed += suppressed
+        return suppressed
+
+    async def add(self, bot_id: int, chat_id: ChatIdType, reason: Optional[str] = None) -> None:
+        pass
+
+    async def discard(self, bot_id: int, chat_id: ChatIdType) -> None:
+        pass
+
+    async def flush(self) -> None:
+        pass
+
+
+class _ReadOnlyDeliveryLog:
+    """Loads the delivered sets of a delivery log and saves nothing"""
+
+    def __init__(self, delivery_log: DeliveryLog):
+        self.delivery_log = delivery_log
+
+    async def load(self, campaign: str) -> DeliveredSet:
+        return await self.delivery_log.load(campaign)
+
+    async def record(self, campaign: str, delivered: DeliveredSet, chat_id: ChatIdType) -> None:
+        delivered.add(chat_id)
+
+    async def save(self, campaign: str, delivered: DeliveredSet) -> None:
+        pass
+
+
+class _TimedRenderer(Renderer):
+    """Counts the renders and the CPU time they take"""
+
+    def __init__(self, renderer: Renderer):
+        super().__init__(renderer.templates, renderer.render)
+        self.variables = renderer.variables
+        self.renders = 0
+        self.cpu_time = 0.0
+
+    def __call__(self, chat_args: Dict) -> Dict:
+        started = time.thread_time()
+        payload = super().__call__(chat_args)
+        self.cpu_time += time.thread_time() - started
+        self.renders += 1
+        return payload
+
+
+def _isolate(
+        broadcaster: 'BaseBroadcaster',
+        suppression: Dict[int, _ReadOnlySuppression],
+        bots: Dict[int, Bot],
+) -> None:
+    """
+    Detach the broadcaster from everything a broadcast writes to, and point it
+    and its send plans to the simulated copies ``bots`` of its bot
+    """
+    for name, value in list(vars(broadcaster).items()):
+        if isinstance(value, PERSISTENT_STORES):
+            setattr(broadcaster, name, None)
+        elif isinstance(value, SendPlan) and id(getattr(value.method, '__self__', None)) in bots:
+            bot = bots[id(value.method.__self__)]
+            setattr(broadcaster, name, value._replace(method=getattr(bot, value.method.__name__)))
+    broadcaster.bot = bots[id(broadcaster.bot)]
+    if broadcaster.suppression_index is not None:
+        index = broadcaster.suppression_index
+        broadcaster.suppression_index = suppression.setdefault(id(index), _ReadOnlySuppression(index))
+    if broadcaster.delivery_log is not None:
+        broadcaster.delivery_log = _ReadOnlyDeliveryLog(broadcaster.delivery_log)
+    broadcaster.observers = []
+    broadcaster.rate_limiter = _SimulatedRateLimiter()
+    if broadcaster.renderer is not None:
+        broadcaster.renderer = _TimedRenderer(broadcaster.renderer)
+
+    recipients = broadcaster.recipients
+    if broadcaster._source is not None:
+        # Chats of a stream are appended while it is consumed
+        broadcaster.recipients = copy.deepcopy(recipients)
+        if broadcaster._seen is not None:
+            broadcaster._seen = dict(broadcaster._seen)
+    else:
+        broadcaster.recipients = copy.copy(recipients)
+        broadcaster.recipients.status = bytearray(len(recipients))
+        broadcaster.recipients.message_ids = array('q', bytes(recipients.message_ids.itemsize * len(recipients)))
+
+
+async def simulate(
+        broadcaster: 'BaseBroadcaster',
+        model: Optional[SimulationModel] = None,
+        trace_memory: bool = True,
+) -> DryRunReport:
+    """Run ``broadcaster`` against a simulated Bot API, see ``BaseBroadcaster.dry_run``"""
+    model = model or SimulationModel()
+    rng = random.Random(model.seed)
+    senders: List['BaseBroadcaster'] = getattr(broadcaster, 'shards', None) or [broadcaster]
+    units = [broadcaster, *(sender for sender in senders if sender is not broadcaster)]
+    states = [dict(vars(unit)) for unit in units]
+    clocks: Dict[int, SimulatedClock] = {}
+    for sender in senders:
+        if id(sender.bot) not in clocks:
+            clocks[id(sender.bot)] = SimulatedClock(model, rng, sender.concurrency, sender.rate_limiter)
+    # Private copies of the bots, calls stop at their network boundary and
+    # everything above it runs as usual. The bots themselves stay untouched,
+    # they may be serving updates or other broadcasts meanwhile
+    bots: Dict[int, Bot] = {}
+    for unit in units:
+        if id(unit.bot) not in bots:
+            bot = bots[id(unit.bot)] = copy.copy(unit.bot)
+            clock = clocks.get(id(unit.bot))
+            if clock is None:
+                clock = clocks[id(unit.bot)] = SimulatedClock(model, rng, unit.concurrency, unit.rate_limiter)
+            bot.request = clock.request
+    suppression: Dict[int, _ReadOnlySuppression] = {}
+
+    tracing = trace_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    elif trace_memory and hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    started = time.process_time()
+    try:
+        for unit in units:
+            _isolate(unit, suppression, bots)
+        await broadcaster._run(broadcaster._iter_chats())
+        cpu_time = time.process_time() - started
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        recipients = broadcaster.recipients
+        renderers = {id(unit.renderer): unit.renderer for unit in units if unit.renderer is not None}
+        calls = Counter()
+        for clock in clocks.values():
+            calls.update(clock.calls)
+        return DryRunReport(
+            recipients=len(recipients),
+            duplicates=broadcaster._duplicate_count,
+            suppressed=sum(index.suppressed for index in suppression.values()),
+            already_delivered=broadcaster._already_delivered,
+            successful=recipients.count(SUCCESSFUL) - broadcaster._already_delivered,
+            failed=recipients.count(FAILED),
+            retries=sum(clock.flood_waits for clock in clocks.values()),
+            calls=dict(calls),
+            eta=max(clock.end for clock in clocks.values()),
+            renders=sum(renderer.renders for renderer in renderers.values()),
+            render_cpu=sum(renderer.cpu_time for renderer in renderers.values()),
+            cpu_time=cpu_time,
+            peak_memory=peak_memory,
+        )
+    finally:
+        if tracing:
+            tracemalloc.stop()
+        for unit, state in zip(units, states):
+            vars(unit).clear()
+            vars(unit).update(state)
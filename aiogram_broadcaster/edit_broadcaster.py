@@ -0,0 +1,116 @@
+from string import Template
+from typing import Dict, List, Optional, Union
+
+from aiogram import Bot
+from aiogram.types import Message
+from aiogram.utils import exceptions
+
+from .types import ChatsType, MarkupType, TextType, ChatIdType
+from .delivery import DeliveryLog
+from .metrics import BroadcastObserver
+from .progress import BaseProgressStore
+from .rate_limiter import RateLimiter
+from .results import BaseResultSink
+from .sent_message_broadcaster import SentMessageBroadcaster
+from .session import SessionConfig
+from .suppression import SuppressionIndex
+
+
+class EditBroadcaster(SentMessageBroadcaster):
+    """
+    Edits previously sent messages, every chat needs a ``message_id``
+    (see ``get_sent_messages``).
+
+    With ``text`` the message text is replaced, with ``caption`` the media
+    caption, otherwise only the ``reply_markup``. Both are templates
+    filled from the chat variables. A message that already has the new
+    content counts as edited.
+    """
+
+    def __init__(
+            self,
+            chats: ChatsType,
+            text: Optional[TextType] = None,
+            caption: Optional[TextType] = None,
+            kwargs: Optional[Dict] = None,
+            parse_mode: Optional[str] = None,
+            disable_web_page_preview: Optional[bool] = None,
+            reply_markup: MarkupType = None,
+            bot: Optional[Bot] = None,
+            bot_token: Optional[str] = None,
+            timeout: Optional[float] = None,
+            concurrency: int = 1,
+            rate_limiter: Optional[RateLimiter] = None,
+            max_retries: int = 5,
+            progress_store: Optional[BaseProgressStore] = None,
+            observers: Optional[List[BroadcastObserver]] = None,
+            suppression_index: Optional[SuppressionIndex] = None,
+            result_sink: Optional[BaseResultSink] = None,
+            session_config: Optional[SessionConfig] = None,
+            campaign: Optional[str] = None,
+            delivery_log: Optional[DeliveryLog] = None,
+            duplicates: Optional[str] = None,
+            logger=__name__,
+    ):
+        if text is not None and caption is not None:
+            raise AttributeError('You can’t pass both text and caption')
+        if text is None and caption is None and reply_markup is None:
+            raise AttributeError('You should pass a text, a caption or a reply_markup')
+        super().__init__(
+            chats=chats,
+            kwargs=kwargs,
+            reply_markup=reply_markup,
+            bot=bot,
+            bot_token=bot_token,
+            timeout=timeout,
+            concurrency=concurrency,
+            rate_limiter=rate_limiter,
+            max_retries=max_retries,
+            progress_store=progress_store,
+            observers=observers,
+            suppression_index=suppression_index,
+            result_sink=result_sink,
+            session_config=session_config,
+            campaign=campaign,
+            delivery_log=delivery_log,
+            duplicates=duplicates,
+            logger=logger,
+        )
+        self._require_variable('message_id')
+        self.text = Template(text) if isinstance(text, str) else text
+        self.caption = Template(caption) if isinstance(caption, str) else caption
+        self.parse_mode = parse_mode
+        self.disable_web_page_preview = disable_web_page_preview
+
+    async def _send(
+            self,
+            chat_id: ChatIdType,
+            chat_args: Dict,
+    ) -> Union[Message, bool, None]:
+        message_id = chat_args['message_id']
+        try:
+            if self.text is not None:
+                return await self.bot.edit_message_text(
+                    text=self.text.safe_substitute(chat_args),
+                    chat_id=chat_id,
+                    message_id=message_id,
+                    parse_mode=self.parse_mode,
+                    disable_web_page_preview=self.disable_web_page_preview,
+                    reply_markup=self.reply_markup,
+                )
+            if self.caption is not None:
+                return await self.bot.edit_message_caption(
+                    chat_id=chat_id,
+                    message_id=message_id,
+                    caption=self.caption.safe_substitute(chat_args),
+                    parse_mode=self.parse_mode,
+                    reply_markup=self.reply_markup,
+                )
+            return await self.bot.edit_message_reply_markup(
+                chat_id=chat_id,
+                message_id=message_id,
+                reply_markup=self.reply_markup,
+            )
+        except exceptions.MessageNotModified:
+            self.logger.debug("Target [ID:%s]: message %s is already up to date", chat_id, message_id)
+            return None
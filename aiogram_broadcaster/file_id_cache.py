@@ -0,0 +1,70 @@
+import hashlib
+import sqlite3
+import time
+from typing import Optional
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file read in chunks, the file is never loaded into memory as a whole"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileIdCache:
+    """
+    Persistent content hash → file_id mapping, so an asset is uploaded only once.
+
+    File ids are only valid for the bot that uploaded the file, so keys
+    include the bot id. Entries unused for ``ttl`` seconds are ignored, and
+    the least recently used ones are evicted above ``max_entries``.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS file_ids (key TEXT PRIMARY KEY, file_id TEXT NOT NULL, used_at REAL NOT NULL)'
+        )
+        self._connection.execute('CREATE INDEX IF NOT EXISTS file_ids_used_at ON file_ids (used_at)')
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(bot_id: int, media_type: str, content_hash: str) -> str:
+        return f'{bot_id}:{media_type}:{content_hash}'
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._connection.execute('SELECT file_id, used_at FROM file_ids WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        file_id, used_at = row
+        now = time.time()
+        with self._connection:
+            if self.ttl is not None and now - used_at > self.ttl:
+                self._connection.execute('DELETE FROM file_ids WHERE key = ?', (key,))
+                return None
+            self._connection.execute('UPDATE file_ids SET used_at = ? WHERE key = ?', (now, key))
+        return file_id
+
+    def set(self, key: str, file_id: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO file_ids (key, file_id, used_at) VALUES (?, ?, ?)',
+                (key, file_id, time.time()),
+            )
+            self._connection.execute(
+                'DELETE FROM file_ids WHERE key IN '
+                '(SELECT key FROM file_ids ORDER BY used_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connection:
+            self._connection.execute('DELETE FROM file_ids WHERE key = ?', (key,))
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,112 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Generator, NamedTuple, Optional, Set
+
+from .recipients import FAILED, SUCCESSFUL
+from .session import close_session
+
+if TYPE_CHECKING:
+    from .base import BaseBroadcaster
+
+
+class BroadcastProgress(NamedTuple):
+    successful: int
+    failed: int
+    # None for a streamed source, its length is unknown
+    total: Optional[int]
+
+    @property
+    def done(self) -> int:
+        return self.successful + self.failed
+
+
+class BroadcastHandle:
+    """
+    A broadcast running in the background, returned by ``BaseBroadcaster.start``.
+
+    Await it to wait for the end of the broadcast, or control it with
+    ``pause``, ``resume``, ``stop`` (finish the sends in flight and take no
+    new chats) and ``cancel``.
+    """
+
+    active: Set['BroadcastHandle'] = set()
+
+    def __init__(self, broadcaster: 'BaseBroadcaster', task: asyncio.Future):
+        self.broadcaster = broadcaster
+        self.task = task
+        BroadcastHandle.active.add(self)
+        task.add_done_callback(self._on_done)
+
+    def __await__(self) -> Generator[Any, None, None]:
+        return self.task.__await__()
+
+    def __str__(self) -> str:
+        return f'<{self.__class__.__name__}(id={self.id}; status={self.status})>'
+
+    def _on_done(self, task: asyncio.Future) -> None:
+        BroadcastHandle.active.discard(self)
+        # Nobody may be awaiting a background broadcast, so its failure is logged here
+        if not task.cancelled() and task.exception() is not None:
+            self.broadcaster.logger.error(
+                f'Broadcast {self.id} failed', exc_info=task.exception(),
+            )
+
+    @property
+    def id(self) -> int:
+        return self.broadcaster._id
+
+    @property
+    def progress(self) -> BroadcastProgress:
+        recipients = self.broadcaster.recipients
+        total = len(recipients) if self.broadcaster._source is None else None
+        return BroadcastProgress(recipients.count(SUCCESSFUL), recipients.count(FAILED), total)
+
+    @property
+    def status(self) -> str:
+        if self.task.cancelled():
+            return 'cancelled'
+        if self.task.done():
+            return 'failed' if self.task.exception() else 'done'
+        if self.broadcaster.is_stopping:
+            return 'stopping'
+        return 'paused' if self.broadcaster.is_paused else 'running'
+
+    def done(self) -> bool:
+        return self.task.done()
+
+    def pause(self) -> None:
+        self.broadcaster.pause()
+
+    def resume(self) -> None:
+        self.broadcaster.unpause()
+
+    def stop(self) -> None:
+        self.broadcaster.stop()
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+
+async def shutdown_broadcasts(timeout: Optional[float] = None, close_bots: bool = True) -> None:
+    """
+    Stop every background broadcast: sends in flight are completed and the
+    progress is flushed, so they can be resumed later. Broadcasts still
+    running after ``timeout`` seconds are cancelled. Then the sessions of
+    their bots are closed
+    """
+    handles = list(BroadcastHandle.active)
+    for handle in handles:
+        handle.stop()
+    tasks = [handle.task for handle in handles]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    if close_bots:
+        bots = {
+            id(bot): bot
+            for handle in handles
+            for bot in getattr(handle.broadcaster, 'bots', [handle.broadcaster.bot])
+        }
+        for bot in bots.values():
+            await close_session(bot)
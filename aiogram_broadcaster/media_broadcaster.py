@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from string import Template
+from typing import Dict, List, Optional, Union
+
+from aiogram import Bot
+from aiogram.types import InputFile, Message
+from aiogram.utils import exceptions
+
+from .types import ChatsType, MarkupType, TextType, ChatIdType
+from .base import BaseBroadcaster
+from .delivery import DeliveryLog
+from .file_id_cache import FileIdCache, hash_file
+from .metrics import BroadcastObserver
+from .progress import BaseProgressStore
+from .rate_limiter import RateLimiter
+from .results import BaseResultSink
+from .session import SessionConfig
+from .suppression import SuppressionIndex
+
+MEDIA_METHODS = {
+    'photo': 'send_photo',
+    'video': 'send_video',
+    'animation': 'send_animation',
+    'document': 'send_document',
+    'audio': 'send_audio',
+    'voice': 'send_voice',
+    'video_note': 'send_video_note',
+    'sticker': 'send_sticker',
+}
+UNCAPTIONED = ('video_note', 'sticker')
+
+
+class MediaBroadcaster(BaseBroadcaster):
+    """
+    Broadcasts a local file, a URL or an existing file_id.
+
+    The file is uploaded with the first send only, streamed from disk, and
+    every later recipient gets the file_id Telegram returned. With a
+    ``file_id_cache`` the file_id is also reused by later broadcasts of the
+    same content.
+    """
+
+    def __init__(
+            self,
+            chats: ChatsType,
+            media: Union[str, Path],
+            media_type: str = 'photo',
+            caption: Optional[TextType] = None,
+            kwargs: Optional[Dict] = None,
+            parse_mode: Optional[str] = None,
+            disable_notification: Optional[bool] = None,
+            reply_to_message_id: Optional[int] = None,
+            allow_sending_without_reply: Optional[bool] = None,
+            reply_markup: MarkupType = None,
+            bot: Optional[Bot] = None,
+            bot_token: Optional[str] = None,
+            timeout: Optional[float] = None,
+            concurrency: int = 1,
+            rate_limiter: Optional[RateLimiter] = None,
+            max_retries: int = 5,
+            progress_store: Optional[BaseProgressStore] = None,
+            observers: Optional[List[BroadcastObserver]] = None,
+            suppression_index: Optional[SuppressionIndex] = None,
+            result_sink: Optional[BaseResultSink] = None,
+            session_config: Optional[SessionConfig] = None,
+            file_id_cache: Optional[FileIdCache] = None,
+            campaign: Optional[str] = None,
+            delivery_log: Optional[DeliveryLog] = None,
+            duplicates: Optional[str] = 'first',
+            logger=__name__,
+    ):
+        if media_type not in MEDIA_METHODS:
+            raise ValueError(f'media_type must be one of {", ".join(MEDIA_METHODS)}')
+        super().__init__(
+            chats=chats,
+            kwargs=kwargs,
+            disable_notification=disable_notification,
+            reply_to_message_id=reply_to_message_id,
+            allow_sending_without_reply=allow_sending_without_reply,
+            reply_markup=reply_markup,
+            bot=bot,
+            bot_token=bot_token,
+            timeout=timeout,
+            concurrency=concurrency,
+            rate_limiter=rate_limiter,
+            max_retries=max_retries,
+            progress_store=progress_store,
+            observers=observers,
+            suppression_index=suppression_index,
+            result_sink=result_sink,
+            session_config=session_config,
+            campaign=campaign,
+            delivery_log=delivery_log,
+            duplicates=duplicates,
+            logger=logger,
+        )
+        self.media_type = media_type
+        self.caption = Template(caption) if isinstance(caption, str) else caption
+        self.parse_mode = parse_mode
+        self.file_id_cache = file_id_cache
+
+        media = str(media)
+        self.path: Optional[str] = None
+        self.url: Optional[str] = None
+        self.file_id: Optional[str] = None
+        if media.startswith(('http://', 'https://')):
+            self.url = media
+        elif os.path.isfile(media):
+            self.path = media
+        else:
+            self.file_id = media
+        self._upload_lock: Optional[asyncio.Lock] = None
+        self._cache_key: Optional[str] = None
+
+    async def _load_cached_file_id(self) -> None:
+        if self.path is not None:
+            content_hash = await asyncio.get_event_loop().run_in_executor(None, hash_file, self.path)
+        else:
+            content_hash = hashlib.sha256(self.url.encode()).hexdigest()
+        self._cache_key = FileIdCache.make_key(self.bot.id, self.media_type, content_hash)
+        self.file_id = self.file_id_cache.get(self._cache_key)
+
+    def _remember_file_id(self, message: Message) -> None:
+        if self.media_type == 'photo':
+            self.file_id = message.photo[-1].file_id
+        else:
+            self.file_id = getattr(message, self.media_type).file_id
+        if self._cache_key is not None:
+            self.file_id_cache.set(self._cache_key, self.file_id)
+        self.logger.debug(f'{self.media_type} uploaded once, reusing file_id {self.file_id}')
+
+    async def _send_media(self, chat_id: ChatIdType, media: Union[str, InputFile], chat_args: Dict) -> Message:
+        kwargs = {
+            self.media_type: media,
+            'disable_notification': self.disable_notification,
+            'reply_to_message_id': self.reply_to_message_id,
+            'allow_sending_without_reply': self.allow_sending_without_reply,
+            'reply_markup': self.reply_markup,
+        }
+        if self.caption is not None and self.media_type not in UNCAPTIONED:
+            kwargs['caption'] = self.caption.safe_substitute(chat_args)
+            kwargs['parse_mode'] = self.parse_mode
+        return await getattr(self.bot, MEDIA_METHODS[self.media_type])(chat_id=chat_id, **kwargs)
+
+    async def _upload(self, chat_id: ChatIdType, chat_args: Dict) -> Message:
+        if self.file_id_cache is not None and self._cache_key is None:
+            await self._load_cached_file_id()
+            if self.file_id is not None:
+                try:
+                    return await self._send_media(chat_id, self.file_id, chat_args)
+                except (
+                        exceptions.WrongFileIdentifier,
+                        exceptions.WrongRemoteFileIdSpecified,
+                        exceptions.TypeOfFileMismatch,
+                ) as e:
+                    # The cached file_id may have expired, upload the file again
+                    self.logger.warning('Cached file_id %s was rejected (%s), uploading again', self.file_id, e)
+                    self.file_id_cache.delete(self._cache_key)
+                    self.file_id = None
+
+        if self.path is not None:
+            # InputFile streams the opened file, it is never read into memory as a whole
+            media = InputFile(self.path)
+            try:
+                message = await self._send_media(chat_id, media, chat_args)
+            finally:
+                media.file.close()
+        else:
+            message = await self._send_media(chat_id, self.url, chat_args)
+        self._remember_file_id(message)
+        return message
+
+    async def _send(
+            self,
+            chat_id: ChatIdType,
+            chat_args: Dict,
+    ) -> Message:
+        if self.file_id is None:
+            if self._upload_lock is None:
+                self._upload_lock = asyncio.Lock()
+            # Other workers wait for the first upload instead of uploading the same file
+            async with self._upload_lock:
+                if self.file_id is None:
+                    return await self._upload(chat_id, chat_args)
+        return await self._send_media(chat_id, self.file_id, chat_args)
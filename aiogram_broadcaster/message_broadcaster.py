@@ -1,14 +1,21 @@
-from asyncio import sleep
 from copy import deepcopy
 from string import Template
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
 
 from aiogram import Bot
-from aiogram.types import Message, ParseMode
-from aiogram.utils import exceptions
+from aiogram.types import Message
 
 from .types import ChatsType, MarkupType, ChatIdType
 from .base import BaseBroadcaster
+from .delivery import DeliveryLog
+from .metrics import BroadcastObserver
+from .progress import BaseProgressStore
+from .rate_limiter import RateLimiter
+from .rendering import RenderFunction, RenderPipeline, Renderer
+from .results import BaseResultSink
+from .session import SessionConfig
+from .suppression import SuppressionIndex
+from .send_plan import build_copy_plan, build_send_plan
 
 
 class MessageBroadcaster(BaseBroadcaster):
@@ -23,7 +30,21 @@ class MessageBroadcaster(BaseBroadcaster):
             reply_markup: MarkupType = None,
             bot: Optional[Bot] = None,
             bot_token: Optional[str] = None,
-            timeout: float = 0.02,
+            timeout: Optional[float] = None,
+            concurrency: int = 1,
+            rate_limiter: Optional[RateLimiter] = None,
+            max_retries: int = 5,
+            progress_store: Optional[BaseProgressStore] = None,
+            observers: Optional[List[BroadcastObserver]] = None,
+            suppression_index: Optional[SuppressionIndex] = None,
+            result_sink: Optional[BaseResultSink] = None,
+            session_config: Optional[SessionConfig] = None,
+            use_copy_message: bool = False,
+            render: Optional[RenderFunction] = None,
+            render_pipeline: Optional[RenderPipeline] = None,
+            campaign: Optional[str] = None,
+            delivery_log: Optional[DeliveryLog] = None,
+            duplicates: Optional[str] = 'first',
             logger=__name__
     ):
         super().__init__(
@@ -36,9 +57,47 @@ class MessageBroadcaster(BaseBroadcaster):
             bot=bot,
             bot_token=bot_token,
             timeout=timeout,
+            concurrency=concurrency,
+            rate_limiter=rate_limiter,
+            max_retries=max_retries,
+            progress_store=progress_store,
+            observers=observers,
+            suppression_index=suppression_index,
+            result_sink=result_sink,
+            session_config=session_config,
+            render_pipeline=render_pipeline,
+            campaign=campaign,
+            delivery_log=delivery_log,
+            duplicates=duplicates,
             logger=logger,
         )
         self.message = message
+        self.template = self.compile_template(message)
+        if use_copy_message and not isinstance(self.template, Template):
+            self.send_plan = build_copy_plan(
+                bot=self.bot,
+                message=message,
+                disable_notification=self.disable_notification,
+                reply_to_message_id=self.reply_to_message_id,
+                allow_sending_without_reply=self.allow_sending_without_reply,
+                reply_markup=self.reply_markup,
+            )
+        else:
+            self.send_plan = build_send_plan(
+                bot=self.bot,
+                message=message,
+                text=self.template if isinstance(self.template, str) else None,
+                disable_notification=self.disable_notification,
+                disable_web_page_preview=self.disable_web_page_preview,
+                reply_to_message_id=self.reply_to_message_id,
+                allow_sending_without_reply=self.allow_sending_without_reply,
+                reply_markup=self.reply_markup,
+            )
+
+        if isinstance(self.template, Template):
+            self.renderer = Renderer({self.send_plan.text_field: self.template}, render)
+        else:
+            self.renderer = Renderer({}, render)
 
     @staticmethod
     async def send_copy(
@@ -49,108 +108,40 @@ class MessageBroadcaster(BaseBroadcaster):
             reply_to_message_id: Optional[int] = None,
             allow_sending_without_reply: Optional[bool] = None,
             reply_markup: MarkupType = None,
+            text: Optional[str] = None,
     ) -> Message:
-        kwargs = {
-            "chat_id": chat_id,
-            "allow_sending_without_reply": allow_sending_without_reply,
-            "reply_markup": reply_markup or message.reply_markup,
-            "parse_mode": ParseMode.HTML,
-            "disable_notification": disable_notification,
-            "reply_to_message_id": reply_to_message_id,
-        }
-        if message.caption:
-            text = message.caption
-        elif message.text:
-            text = message.text
-        else:
-            text = None
+        plan = build_send_plan(
+            bot=message.bot,
+            message=message,
+            text=message.caption or message.text,
+            disable_notification=disable_notification,
+            disable_web_page_preview=disable_web_page_preview,
+            reply_to_message_id=reply_to_message_id,
+            allow_sending_without_reply=allow_sending_without_reply,
+            reply_markup=reply_markup,
+        )
+        return await plan.send(chat_id, text)
 
-        if message.text:
-            kwargs["disable_web_page_preview"] = disable_web_page_preview
-            return await message.bot.send_message(text=text, **kwargs)
-        elif message.audio:
-            return await message.bot.send_audio(
-                audio=message.audio.file_id,
-                caption=text,
-                title=message.audio.title,
-                performer=message.audio.performer,
-                duration=message.audio.duration,
-                **kwargs,
-            )
-        elif message.animation:
-            return await message.bot.send_animation(
-                animation=message.animation.file_id, caption=text, **kwargs
-            )
-        elif message.document:
-            return await message.bot.send_document(
-                document=message.document.file_id, caption=text, **kwargs
-            )
-        elif message.photo:
-            return await message.bot.send_photo(
-                photo=message.photo[-1].file_id, caption=text, **kwargs
-            )
-        elif message.sticker:
-            kwargs.pop("parse_mode")
-            return await message.bot.send_sticker(sticker=message.sticker.file_id, **kwargs)
-        elif message.video:
-            return await message.bot.send_video(
-                video=message.video.file_id, caption=text, **kwargs
-            )
-        elif message.video_note:
-            kwargs.pop("parse_mode")
-            return await message.bot.send_video_note(
-                video_note=message.video_note.file_id, **kwargs
-            )
-        elif message.voice:
-            return await message.bot.send_voice(
-                voice=message.voice.file_id,
-                caption=text,
-                **kwargs,
-            )
-        elif message.contact:
-            kwargs.pop("parse_mode")
-            return await message.bot.send_contact(
-                phone_number=message.contact.phone_number,
-                first_name=message.contact.first_name,
-                last_name=message.contact.last_name,
-                vcard=message.contact.vcard,
-                **kwargs,
-            )
-        elif message.venue:
-            kwargs.pop("parse_mode")
-            return await message.bot.send_venue(
-                latitude=message.venue.location.latitude,
-                longitude=message.venue.location.longitude,
-                title=message.venue.title,
-                address=message.venue.address,
-                foursquare_id=message.venue.foursquare_id,
-                foursquare_type=message.venue.foursquare_type,
-                **kwargs,
-            )
-        elif message.location:
-            kwargs.pop("parse_mode")
-            return await message.bot.send_location(
-                latitude=message.location.latitude,
-                longitude=message.location.longitude,
-                **kwargs,
-            )
-        elif message.poll:
-            kwargs.pop("parse_mode")
-            return await message.bot.send_poll(
-                question=message.poll.question,
-                options=[option.text for option in message.poll.options],
-                is_anonymous=message.poll.is_anonymous,
-                allows_multiple_answers=message.poll.allows_multiple_answers,
-                **kwargs,
-            )
-        elif message.dice:
-            kwargs.pop("parse_mode")
-            return await message.bot.send_dice(
-                emoji=message.dice.emoji,
-                **kwargs,
-            )
-        else:
-            raise TypeError("This type of message can't be copied.")
+    @staticmethod
+    def compile_template(message: Message) -> Union[Template, str, None]:
+        """
+        Parse the message text once per broadcast.
+        Returns the plain html text when it has no placeholders or escapes
+        """
+        if not (message.text or message.caption):
+            return None
+        html_text = message.html_text
+        template = Template(html_text)
+        for match in template.pattern.finditer(html_text):
+            # "$$" has to be substituted too, it stands for a single "$"
+            if match.group('named') or match.group('braced') or match.group('escaped'):
+                return template
+        return html_text
+
+    def get_text(self, text_args: dict) -> Optional[str]:
+        if isinstance(self.template, Template):
+            return self.template.safe_substitute(text_args)
+        return None
 
     @staticmethod
     def get_updated_message(message: Message, text_args: dict) -> Message:
@@ -165,38 +156,12 @@ class MessageBroadcaster(BaseBroadcaster):
 
         return msg
 
-    async def send(
+    async def _send(
             self,
             chat_id: ChatIdType,
             chat_args: Dict,
-    ) -> bool:
-        try:
-            msg = self.get_updated_message(self.message, chat_args)
-            await self.send_copy(
-                message=msg,
-                chat_id=chat_id,
-                disable_notification=self.disable_notification,
-                disable_web_page_preview=self.disable_web_page_preview,
-                reply_to_message_id=self.reply_to_message_id,
-                allow_sending_without_reply=self.allow_sending_without_reply,
-                reply_markup=self.reply_markup,
-            )
-        except exceptions.RetryAfter as e:
-            self.logger.debug(
-                f"Target [ID:{chat_id}]: Flood limit is exceeded. Sleep {e.timeout} seconds."
-            )
-            await sleep(e.timeout)
-            return await self.send(chat_id, chat_args)  # Recursive call
-        except (
-                exceptions.BotBlocked,
-                exceptions.ChatNotFound,
-                exceptions.UserDeactivated,
-                exceptions.ChatNotFound
-        ) as e:
-            self.logger.debug(f"Target [ID:{chat_id}]: {e.match}")
-        except exceptions.TelegramAPIError:
-            self.logger.exception(f"Target [ID:{chat_id}]: failed")
-        else:
-            self.logger.debug(f"Target [ID:{chat_id}]: success")
-            return True
-        return False
+    ) -> Message:
+        return await self._send_rendered(chat_id, self.renderer(chat_args))
+
+    async def _send_rendered(self, chat_id: ChatIdType, payload: Dict) -> Message:
+        return await self.send_plan.send_payload(chat_id, payload)
@@ -0,0 +1,174 @@
+import bisect
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, Optional, Sequence
+
+from .types import ChatIdType
+
+if TYPE_CHECKING:
+    from .base import BaseBroadcaster
+
+DEFAULT_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class BroadcastObserver:
+    """
+    Receives send events of the broadcasters it is passed to.
+    Every hook is a no-op, override the ones you need.
+    Hooks are called on the event loop, so keep them cheap
+    """
+
+    def on_sent(self, broadcaster: 'BaseBroadcaster', chat_id: ChatIdType, latency: float) -> None:
+        pass
+
+    def on_failed(
+            self,
+            broadcaster: 'BaseBroadcaster',
+            chat_id: ChatIdType,
+            error: BaseException,
+            latency: float,
+    ) -> None:
+        pass
+
+    def on_retry_after(self, broadcaster: 'BaseBroadcaster', chat_id: ChatIdType, timeout: float) -> None:
+        pass
+
+    def on_queue_depth(self, broadcaster: 'BaseBroadcaster', depth: int) -> None:
+        pass
+
+
+class MetricsCollector(BroadcastObserver):
+    """In-process aggregation of the broadcast metrics, read it with :meth:`snapshot`"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.sent = 0
+        self.failed: Counter = Counter()
+        self.latency_buckets = [0] * (len(self.buckets) + 1)
+        self.latency_sum = 0.0
+        self.retry_after = 0
+        self.retry_after_sleep = 0.0
+        self.queue_depth = 0
+        self.effective_rate: Optional[float] = None
+        self._started = time.monotonic()
+
+    def _observe_latency(self, latency: float) -> None:
+        self.latency_buckets[bisect.bisect_left(self.buckets, latency)] += 1
+        self.latency_sum += latency
+
+    def on_sent(self, broadcaster: 'BaseBroadcaster', chat_id: ChatIdType, latency: float) -> None:
+        self.sent += 1
+        self._observe_latency(latency)
+        self.effective_rate = broadcaster.rate_limiter.effective_rate
+
+    def on_failed(
+            self,
+            broadcaster: 'BaseBroadcaster',
+            chat_id: ChatIdType,
+            error: BaseException,
+            latency: float,
+    ) -> None:
+        self.failed[type(error).__name__] += 1
+        self._observe_latency(latency)
+
+    def on_retry_after(self, broadcaster: 'BaseBroadcaster', chat_id: ChatIdType, timeout: float) -> None:
+        self.retry_after += 1
+        self.retry_after_sleep += timeout
+        self.effective_rate = broadcaster.rate_limiter.effective_rate
+
+    def on_queue_depth(self, broadcaster: 'BaseBroadcaster', depth: int) -> None:
+        self.queue_depth = depth
+
+    def snapshot(self) -> Dict:
+        elapsed = time.monotonic() - self._started
+        observed = sum(self.latency_buckets)
+        return {
+            'sent': self.sent,
+            'failed': dict(self.failed),
+            'throughput': (self.sent + sum(self.failed.values())) / elapsed if elapsed else 0.0,
+            'effective_rate': self.effective_rate,
+            'latency_avg': self.latency_sum / observed if observed else None,
+            'latency_buckets': dict(zip(self.buckets + (float('inf'),), self.latency_buckets)),
+            'retry_after': self.retry_after,
+            'retry_after_sleep': self.retry_after_sleep,
+            'queue_depth': self.queue_depth,
+        }
+
+
+class PrometheusObserver(BroadcastObserver):
+    """
+    Exports the broadcast metrics through ``prometheus_client``,
+    labelled by broadcaster class and id
+    """
+
+    def __init__(
+            self,
+            registry=None,
+            namespace: str = 'aiogram_broadcaster',
+            buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        try:
+            import prometheus_client
+        except ImportError:
+            raise ImportError('PrometheusObserver requires prometheus_client: pip install prometheus-client')
+
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        labels = ['broadcast']
+        options = dict(namespace=namespace, registry=registry)
+        self.sent = prometheus_client.Counter(
+            'messages_sent', 'Messages delivered', labels, **options,
+        )
+        self.failed = prometheus_client.Counter(
+            'messages_failed', 'Messages not delivered by error class', labels + ['error'], **options,
+        )
+        self.latency = prometheus_client.Histogram(
+            'send_latency_seconds', 'Duration of a single send request', labels, buckets=buckets, **options,
+        )
+        self.retry_after = prometheus_client.Counter(
+            'retry_after', 'Flood limit errors received', labels, **options,
+        )
+        self.retry_after_sleep = prometheus_client.Counter(
+            'retry_after_sleep_seconds', 'Pause requested by flood limit errors', labels, **options,
+        )
+        self.effective_rate = prometheus_client.Gauge(
+            'effective_rate', 'Current global send rate of the limiter', labels, **options,
+        )
+        self.queue_depth = prometheus_client.Gauge(
+            'queue_depth', 'Chats waiting for a free worker', labels, **options,
+        )
+
+    @staticmethod
+    def _label(broadcaster: 'BaseBroadcaster') -> str:
+        return f'{broadcaster.__class__.__name__}:{broadcaster._id}'
+
+    def _set_rate(self, broadcaster: 'BaseBroadcaster') -> None:
+        rate = broadcaster.rate_limiter.effective_rate
+        if rate is not None:
+            self.effective_rate.labels(self._label(broadcaster)).set(rate)
+
+    def on_sent(self, broadcaster: 'BaseBroadcaster', chat_id: ChatIdType, latency: float) -> None:
+        label = self._label(broadcaster)
+        self.sent.labels(label).inc()
+        self.latency.labels(label).observe(latency)
+        self._set_rate(broadcaster)
+
+    def on_failed(
+            self,
+            broadcaster: 'BaseBroadcaster',
+            chat_id: ChatIdType,
+            error: BaseException,
+            latency: float,
+    ) -> None:
+        label = self._label(broadcaster)
+        self.failed.labels(label, type(error).__name__).inc()
+        self.latency.labels(label).observe(latency)
+
+    def on_retry_after(self, broadcaster: 'BaseBroadcaster', chat_id: ChatIdType, timeout: float) -> None:
+        label = self._label(broadcaster)
+        self.retry_after.labels(label).inc()
+        self.retry_after_sleep.labels(label).inc(timeout)
+        self._set_rate(broadcaster)
+
+    def on_queue_depth(self, broadcaster: 'BaseBroadcaster', depth: int) -> None:
+        self.queue_depth.labels(self._label(broadcaster)).set(depth)
@@ -0,0 +1,143 @@
+import zlib
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Type, Union
+
+from aiogram import Bot
+from aiogram.types import Message
+
+from .types import ChatsType, ChatIdType
+from .base import BaseBroadcaster
+from .delivery import DeliveryLog
+from .metrics import BroadcastObserver
+from .progress import BaseProgressStore
+from .rate_limiter import RateLimiter
+from .rendering import RenderPipeline
+from .results import BaseResultSink
+from .session import SessionConfig, close_session
+from .suppression import SuppressionIndex
+from .text_broadcaster import TextBroadcaster
+
+RouterType = Union[Callable[[ChatIdType, Dict], int], Mapping[ChatIdType, int]]
+
+
+class MultiBotBroadcaster(BaseBroadcaster):
+    """
+    Splits one broadcast across several bots sharing the same audience.
+
+    Every bot gets its own ``broadcaster_class`` instance (shard) with its own
+    rate limiter and session, so throughput grows with the number of tokens.
+    ``router`` picks the shard index for a chat: either a callable taking
+    ``(chat_id, chat_args)`` or a mapping from chat id to index. By default,
+    and for chats missing from the mapping, chats are spread by a stable
+    hash of their id. Results of all shards are
+    collected in this broadcaster.
+
+    Note that file ids are bound to the bot that received the file, so a
+    ``MessageBroadcaster`` shard can only forward media its own bot knows.
+    """
+
+    def __init__(
+            self,
+            chats: ChatsType,
+            bots: Optional[List[Bot]] = None,
+            bot_tokens: Optional[List[str]] = None,
+            broadcaster_class: Type[BaseBroadcaster] = TextBroadcaster,
+            router: Optional[RouterType] = None,
+            rate_limiter_factory: Callable[[], RateLimiter] = RateLimiter,
+            kwargs: Optional[Dict] = None,
+            concurrency: int = 1,
+            progress_store: Optional[BaseProgressStore] = None,
+            observers: Optional[List[BroadcastObserver]] = None,
+            suppression_index: Optional[SuppressionIndex] = None,
+            result_sink: Optional[BaseResultSink] = None,
+            session_config: Optional[SessionConfig] = None,
+            render_pipeline: Optional[RenderPipeline] = None,
+            campaign: Optional[str] = None,
+            delivery_log: Optional[DeliveryLog] = None,
+            duplicates: Optional[str] = 'first',
+            logger=__name__,
+            **broadcaster_kwargs,
+    ):
+        if bots and bot_tokens:
+            raise AttributeError('You can’t pass both bots and tokens')
+        if bot_tokens:
+            bots = [Bot(token=token) for token in bot_tokens]
+        if not bots:
+            raise AttributeError('You should pass at least one bot instance or token')
+        if 'rate_limiter' in broadcaster_kwargs:
+            raise AttributeError('Every bot needs its own limiter, pass rate_limiter_factory instead')
+        if session_config is None and bot_tokens:
+            session_config = SessionConfig()
+
+        super().__init__(
+            chats=chats,
+            kwargs=kwargs,
+            bot=bots[0],
+            concurrency=concurrency * len(bots),
+            # Shards enforce the limits of their own bots
+            rate_limiter=RateLimiter(rate=None, chat_rate=None, group_rate=None),
+            progress_store=progress_store,
+            observers=observers,
+            suppression_index=suppression_index,
+            result_sink=result_sink,
+            render_pipeline=render_pipeline,
+            campaign=campaign,
+            delivery_log=delivery_log,
+            duplicates=duplicates,
+            logger=logger,
+        )
+        self._owns_bot = bool(bot_tokens)
+        self.bots = bots
+        self.router = router
+        self.shards: List[BaseBroadcaster] = [
+            broadcaster_class(
+                chats=[],
+                bot=bot,
+                concurrency=concurrency,
+                rate_limiter=rate_limiter_factory(),
+                observers=observers,
+                suppression_index=suppression_index,
+                result_sink=result_sink,
+                # Shards size the pool of their own bot
+                session_config=session_config,
+                logger=logger,
+                **broadcaster_kwargs,
+            )
+            for bot in bots
+        ]
+        # Shards render alike, payloads are rendered once here and sent by any of them
+        self.renderer = self.shards[0].renderer
+
+    def _hash_route(self, chat_id: ChatIdType) -> int:
+        key = chat_id if isinstance(chat_id, int) else zlib.crc32(str(chat_id).encode())
+        return key % len(self.shards)
+
+    def route(self, chat_id: ChatIdType, chat_args: Dict) -> BaseBroadcaster:
+        if self.router is None:
+            index = self._hash_route(chat_id)
+        elif isinstance(self.router, Mapping):
+            index = self.router.get(chat_id)
+            if index is None:
+                index = self._hash_route(chat_id)
+        else:
+            index = self.router(chat_id, chat_args)
+        return self.shards[index]
+
+    async def _send(self, chat_id: ChatIdType, chat_args: dict) -> Message:
+        return await self.route(chat_id, chat_args)._send(chat_id=chat_id, chat_args=chat_args)
+
+    async def _deliver(
+            self,
+            chat_id: ChatIdType,
+            chat_args: dict,
+            payload: Optional[Dict] = None,
+    ) -> Tuple[bool, Optional[int]]:
+        return await self.route(chat_id, chat_args)._deliver(chat_id, chat_args, payload)
+
+    async def close_bot(self) -> None:
+        for shard in self.shards:
+            await shard.close_bot()
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        if self._owns_bot:
+            for bot in self.bots:
+                await close_session(bot)
@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Set, Type, Union
+
+from aiogram.types.base import TelegramObject
+
+from .types import ChatsType, ChatIdType
+from .base import BaseBroadcaster
+from .rate_limiter import SharedRateLimiter
+from .recipients import FAILED, SUCCESSFUL, RecipientStore
+from .text_broadcaster import TextBroadcaster
+from .work_queue import BaseWorkQueue, Partition, Results
+
+
+class _TelegramObjectRef(NamedTuple):
+    # aiogram objects keep a weak reference to the bot and can't be pickled
+    cls: Type[TelegramObject]
+    data: Dict
+
+
+def _pack(broadcaster_kwargs: Dict) -> Dict:
+    return {
+        key: _TelegramObjectRef(type(value), value.to_python()) if isinstance(value, TelegramObject) else value
+        for key, value in broadcaster_kwargs.items()
+    }
+
+
+def _unpack(broadcaster_kwargs: Dict) -> Dict:
+    return {
+        key: value.cls.to_object(value.data) if isinstance(value, _TelegramObjectRef) else value
+        for key, value in broadcaster_kwargs.items()
+    }
+
+
+async def _broadcast_partition(
+        broadcaster_class: Type[BaseBroadcaster],
+        bot_token: str,
+        chats: Partition,
+        kwargs: Optional[Dict],
+        broadcaster_kwargs: Dict,
+) -> Results:
+    async with broadcaster_class(chats=chats, kwargs=kwargs, bot_token=bot_token, **broadcaster_kwargs) as broadcaster:
+        await broadcaster.run()
+    return broadcaster.recipients.chats(SUCCESSFUL), broadcaster.recipients.chats(FAILED)
+
+
+def run_partition(
+        broadcaster_class: Type[BaseBroadcaster],
+        bot_token: str,
+        chats: Partition,
+        kwargs: Optional[Dict],
+        broadcaster_kwargs: Dict,
+) -> Results:
+    return asyncio.run(_broadcast_partition(
+        broadcaster_class, bot_token, chats, kwargs, _unpack(broadcaster_kwargs),
+    ))
+
+
+async def run_worker(
+        work_queue: BaseWorkQueue,
+        broadcaster_class: Type[BaseBroadcaster],
+        bot_token: str,
+        kwargs: Optional[Dict] = None,
+        poll_interval: float = 1.0,
+        stop_when_empty: bool = True,
+        **broadcaster_kwargs,
+) -> None:
+    """
+    Claim partitions from the queue and broadcast them until it is empty.
+    Run this on every node taking part in a partitioned broadcast
+    """
+    loop = asyncio.get_event_loop()
+    while True:
+        claimed = await loop.run_in_executor(None, work_queue.claim)
+        if claimed is None:
+            if stop_when_empty:
+                return
+            await asyncio.sleep(poll_interval)
+            continue
+        partition_id, chats = claimed
+        successful, failure = await _broadcast_partition(
+            broadcaster_class, bot_token, chats, kwargs, broadcaster_kwargs,
+        )
+        await loop.run_in_executor(None, work_queue.complete, partition_id, successful, failure)
+
+
+def _run_worker_process(
+        work_queue: BaseWorkQueue,
+        broadcaster_class: Type[BaseBroadcaster],
+        bot_token: str,
+        kwargs: Optional[Dict],
+        broadcaster_kwargs: Dict,
+) -> None:
+    asyncio.run(run_worker(work_queue, broadcaster_class, bot_token, kwargs, **_unpack(broadcaster_kwargs)))
+
+
+class PartitionedBroadcaster:
+    """
+    Splits chats into partitions of ``partition_size`` and broadcasts them
+    with ``broadcaster_class`` in a pool of ``processes`` worker processes.
+
+    With a ``work_queue`` partitions are published to the queue instead;
+    local processes and :func:`run_worker` on other nodes claim them, and
+    the coordinator waits for the queue to drain and collects the results.
+
+    Unless a ``rate_limiter`` is passed, all processes share one
+    :class:`SharedRateLimiter` per bot stored in the temp directory.
+    Bot instances can't cross process boundaries, so a token is required.
+    """
+
+    def __init__(
+            self,
+            chats: ChatsType,
+            bot_token: str,
+            broadcaster_class: Type[BaseBroadcaster] = TextBroadcaster,
+            kwargs: Optional[Dict] = None,
+            partition_size: int = 10000,
+            processes: Optional[int] = None,
+            work_queue: Optional[BaseWorkQueue] = None,
+            poll_interval: float = 1.0,
+            duplicates: Optional[str] = 'first',
+            logger=__name__,
+            **broadcaster_kwargs,
+    ):
+        if not bot_token:
+            raise AttributeError('You should pass a bot token')
+        if partition_size < 1:
+            raise ValueError('partition_size must be a positive integer')
+        if duplicates not in ('first', None):
+            raise ValueError('duplicates must be "first" or None, partitions can\'t merge chats')
+        self.chats = chats
+        self.bot_token = bot_token
+        self.broadcaster_class = broadcaster_class
+        self.kwargs = kwargs
+        self.partition_size = partition_size
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.work_queue = work_queue
+        self.poll_interval = poll_interval
+        self.duplicates = duplicates
+        if 'rate_limiter' not in broadcaster_kwargs:
+            broadcaster_kwargs['rate_limiter'] = SharedRateLimiter(
+                path=os.path.join(tempfile.gettempdir(), 'aiogram_broadcaster_limits.sqlite'),
+                key=bot_token.split(':')[0],
+            )
+        self.broadcaster_kwargs = broadcaster_kwargs
+
+        if not isinstance(logger, logging.Logger):
+            logger = logging.getLogger(logger)
+
+        self.logger = logger
+
+        self.recipients = RecipientStore(kwargs)
+
+    @property
+    def successful(self) -> List[Dict]:
+        return self.recipients.chats(SUCCESSFUL)
+
+    def get_successful(self, id_only: bool = False) -> Union[List[Dict], Sequence[ChatIdType]]:
+        if id_only:
+            return self.recipients.ids(SUCCESSFUL)
+        else:
+            return self.successful
+
+    @property
+    def failure(self) -> List[Dict]:
+        return self.recipients.chats(FAILED)
+
+    def get_failure(self, id_only: bool = False) -> Union[List[Dict], Sequence[ChatIdType]]:
+        if id_only:
+            return self.recipients.ids(FAILED)
+        else:
+            return self.failure
+
+    def _add_results(self, successful: List[Dict], failure: List[Dict]) -> None:
+        for chats, status in ((successful, SUCCESSFUL), (failure, FAILED)):
+            for chat in chats:
+                variables = {key: value for key, value in chat.items() if key not in self.recipients.kwargs}
+                self.recipients.set_status(self.recipients.append(chat['chat_id'], variables), status)
+
+    async def _iter_source(self) -> AsyncIterator[Union[ChatIdType, Dict]]:
+        chats = self.chats
+        if isinstance(chats, int) or isinstance(chats, str):
+            chats = [chats]
+        if hasattr(chats, '__aiter__'):
+            async for chat in chats:
+                yield chat
+        else:
+            for chat in chats:
+                yield chat
+
+    async def _partitions(self) -> AsyncIterator[Partition]:
+        # Duplicates are dropped here, as they may land in different partitions
+        seen: Optional[Set[ChatIdType]] = None if self.duplicates is None else set()
+        partition = []
+        async for chat in self._iter_source():
+            if seen is not None:
+                chat_id = chat.get('chat_id') if isinstance(chat, dict) else chat
+                if chat_id in seen:
+                    continue
+                seen.add(chat_id)
+            partition.append(chat)
+            if len(partition) >= self.partition_size:
+                yield partition
+                partition = []
+        if partition:
+            yield partition
+
+    def _collect(self, done: Set[asyncio.Future]) -> None:
+        for future in done:
+            successful, failure = future.result()
+            self._add_results(successful, failure)
+            self.logger.info(
+                f'Partition finished: {len(successful)}/{len(successful) + len(failure)} messages were sent out'
+            )
+
+    async def _run_pool(self) -> None:
+        loop = asyncio.get_event_loop()
+        broadcaster_kwargs = _pack(self.broadcaster_kwargs)
+        with ProcessPoolExecutor(max(self.processes, 1)) as pool:
+            pending = set()
+            async for partition in self._partitions():
+                # Keep only a couple of partitions per process in memory
+                if len(pending) >= 2 * self.processes:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    self._collect(done)
+                pending.add(loop.run_in_executor(
+                    pool, run_partition,
+                    self.broadcaster_class, self.bot_token, partition, self.kwargs, broadcaster_kwargs,
+                ))
+            if pending:
+                done, _ = await asyncio.wait(pending)
+                self._collect(done)
+
+    async def _run_queue(self) -> None:
+        loop = asyncio.get_event_loop()
+        async for partition in self._partitions():
+            await loop.run_in_executor(None, self.work_queue.put, partition)
+
+        if self.processes > 0:
+            broadcaster_kwargs = _pack(self.broadcaster_kwargs)
+            with ProcessPoolExecutor(self.processes) as pool:
+                await asyncio.gather(*(
+                    loop.run_in_executor(
+                        pool, _run_worker_process,
+                        self.work_queue, self.broadcaster_class, self.bot_token, self.kwargs, broadcaster_kwargs,
+                    )
+                    for _ in range(self.processes)
+                ))
+
+        # Partitions may still be held by other nodes or left behind by a dead worker
+        while await loop.run_in_executor(None, self.work_queue.unfinished):
+            await run_worker(
+                self.work_queue, self.broadcaster_class, self.bot_token, self.kwargs, **self.broadcaster_kwargs,
+            )
+            await asyncio.sleep(self.poll_interval)
+
+        successful, failure = await loop.run_in_executor(None, self.work_queue.results)
+        self._add_results(successful, failure)
+
+    async def run(self) -> None:
+        if self.work_queue is None:
+            await self._run_pool()
+        else:
+            await self._run_queue()
+        successful = self.recipients.count(SUCCESSFUL)
+        total = successful + self.recipients.count(FAILED)
+        self.logger.info(f'{successful}/{total} messages were sent out')
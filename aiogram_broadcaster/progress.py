@@ -0,0 +1,137 @@
+import abc
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .types import ChatIdType
+
+ProgressRecord = Tuple[ChatIdType, bool]
+
+
+class BaseProgressStore(abc.ABC):
+    """
+    Journal of per-chat outcomes used to resume an interrupted broadcast.
+
+    Outcomes are buffered in memory and written out in batches, either when
+    ``batch_size`` records have accumulated or when ``flush_interval``
+    seconds have passed since the last write. Writes run in the default
+    executor so the event loop never waits on the disk.
+    """
+
+    def __init__(self, batch_size: int = 1000, flush_interval: float = 1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[ProgressRecord] = []
+        self._last_flush = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def record(self, chat_id: ChatIdType, success: bool) -> None:
+        self._buffer.append((chat_id, success))
+        if (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            await asyncio.get_event_loop().run_in_executor(None, self._write, batch)
+
+    async def load(self) -> Dict[ChatIdType, bool]:
+        return await asyncio.get_event_loop().run_in_executor(None, self._load)
+
+    async def close(self) -> None:
+        await self.flush()
+        self._close()
+
+    @abc.abstractmethod
+    def _write(self, batch: List[ProgressRecord]) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _load(self) -> Dict[ChatIdType, bool]:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+
+class SQLiteProgressStore(BaseProgressStore):
+    def __init__(self, path: str, batch_size: int = 1000, flush_interval: float = 1.0):
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=FULL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS progress (chat_id PRIMARY KEY, success INTEGER NOT NULL)'
+        )
+        self._connection.commit()
+
+    def _write(self, batch: List[ProgressRecord]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO progress (chat_id, success) VALUES (?, ?)',
+                batch,
+            )
+
+    def _load(self) -> Dict[ChatIdType, bool]:
+        cursor = self._connection.execute('SELECT chat_id, success FROM progress')
+        return {chat_id: bool(success) for chat_id, success in cursor}
+
+    def _close(self) -> None:
+        self._connection.close()
+
+
+class FileProgressStore(BaseProgressStore):
+    """
+    Append-only journal with one ``[chat_id, success]`` JSON array per line.
+
+    A line torn by a crash is ignored on load; later lines override
+    earlier ones for the same chat.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000, flush_interval: float = 1.0):
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        self.path = path
+        self._file = open(path, 'a+', encoding='utf-8')
+        self._terminate_torn_line()
+
+    def _terminate_torn_line(self) -> None:
+        if self._file.tell() == 0:
+            return
+        self._file.seek(self._file.tell() - 1)
+        if self._file.read(1) != '\n':
+            self._file.write('\n')
+            self._file.flush()
+
+    def _write(self, batch: List[ProgressRecord]) -> None:
+        self._file.write(''.join(
+            json.dumps([chat_id, int(success)]) + '\n'
+            for chat_id, success in batch
+        ))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _load(self) -> Dict[ChatIdType, bool]:
+        progress = {}
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    chat_id, success = json.loads(line)
+                except (TypeError, ValueError):
+                    continue
+                progress[chat_id] = bool(success)
+        return progress
+
+    def _close(self) -> None:
+        self._file.close()
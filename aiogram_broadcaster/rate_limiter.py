@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from .types import ChatIdType
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of polling.
+
+    Every acquire takes a token immediately, driving the balance negative
+    if necessary, and sleeps for exactly as long as it takes the bucket
+    to refill the debt. Concurrent callers are therefore served in order
+    and the bucket never issues more than ``rate`` tokens per second.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def set_rate(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self._refill(time.monotonic())
+        self.rate = rate
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller has to wait for it"""
+        self._refill(time.monotonic())
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def is_idle(self) -> bool:
+        self._refill(time.monotonic())
+        return self._tokens >= self.capacity
+
+
+class RateLimiter:
+    """
+    Global token bucket plus lazily created per-chat buckets.
+
+    Telegram allows about 30 messages per second in total, 1 message per
+    second to a single chat and 20 messages per minute to a group.
+    Pass ``None`` to disable any of the limits.
+
+    The limiter is also the shared flood control point: a ``RetryAfter``
+    reported by any sender pauses every caller until the same deadline,
+    and, when ``adaptive`` is set, the global rate follows AIMD — it is
+    multiplied by ``decrease_factor`` once per flood episode and grows
+    back by ``rate_increase`` messages per second of error-free sending.
+    """
+
+    def __init__(
+            self,
+            rate: Optional[float] = 30.0,
+            chat_rate: Optional[float] = 1.0,
+            group_rate: Optional[float] = 20 / 60,
+            max_idle_buckets: int = 10000,
+            adaptive: bool = True,
+            min_rate: float = 1.0,
+            decrease_factor: float = 0.5,
+            rate_increase: float = 1.0,
+    ):
+        if not 0 < decrease_factor < 1:
+            raise ValueError('decrease_factor must be between 0 and 1')
+        self.rate = rate
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.max_idle_buckets = max_idle_buckets
+        self.adaptive = adaptive
+        self.min_rate = min(min_rate, rate) if rate else min_rate
+        self.decrease_factor = decrease_factor
+        self.rate_increase = rate_increase
+        self._bucket: Optional[TokenBucket] = TokenBucket(rate) if rate else None
+        self._chat_buckets: Dict[ChatIdType, TokenBucket] = {}
+        self._prune_threshold = max_idle_buckets
+        self._paused_until = 0.0
+
+    @property
+    def effective_rate(self) -> Optional[float]:
+        return self._bucket.rate if self._bucket is not None else None
+
+    @property
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+    @staticmethod
+    def is_group(chat_id: ChatIdType) -> bool:
+        if isinstance(chat_id, str):
+            return chat_id.startswith('@') or chat_id.startswith('-')
+        return chat_id < 0
+
+    def _chat_bucket(self, chat_id: ChatIdType) -> Optional[TokenBucket]:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is not None:
+            return bucket
+        rate = self.group_rate if self.is_group(chat_id) else self.chat_rate
+        if not rate:
+            return None
+        if len(self._chat_buckets) >= self._prune_threshold:
+            self._prune()
+        bucket = self._chat_buckets[chat_id] = TokenBucket(rate)
+        return bucket
+
+    def _prune(self) -> None:
+        self._chat_buckets = {
+            chat_id: bucket
+            for chat_id, bucket in self._chat_buckets.items()
+            if not bucket.is_idle()
+        }
+        self._prune_threshold = max(self.max_idle_buckets, 2 * len(self._chat_buckets))
+
+    async def _wait_pause(self) -> None:
+        delay = self.paused_for
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.paused_for
+
+    async def acquire(self, chat_id: ChatIdType) -> None:
+        await self._wait_pause()
+        chat_bucket = self._chat_bucket(chat_id)
+        if chat_bucket is not None:
+            await chat_bucket.acquire()
+        await self.acquire_global()
+
+    async def acquire_global(self) -> None:
+        if self._bucket is not None:
+            await self._bucket.acquire()
+        # A flood error may have been reported while we were waiting for a token
+        await self._wait_pause()
+
+    def on_retry_after(self, timeout: float) -> None:
+        now = time.monotonic()
+        new_episode = now >= self._paused_until
+        self._paused_until = max(self._paused_until, now + timeout)
+        if self.adaptive and new_episode and self._bucket is not None:
+            self._bucket.set_rate(max(self.min_rate, self._bucket.rate * self.decrease_factor))
+
+    def on_success(self) -> None:
+        if not self.adaptive or self._bucket is None or self._bucket.rate >= self.rate:
+            return
+        self._bucket.set_rate(min(self.rate, self._bucket.rate + self.rate_increase / self._bucket.rate))
+
+
+class SQLiteTokenBucket:
+    """
+    Token bucket shared between processes through an SQLite file.
+
+    The bucket is stored as a theoretical arrival time (GCRA). Tokens are
+    leased in blocks of ``lease_size`` slots so the database is touched
+    once per block rather than once per message; slots are then paced
+    locally. A pause set by any process moves the shared arrival time, so
+    every process stops sending until the deadline.
+    """
+
+    def __init__(self, path: str, key: str, rate: float, lease_size: int = 5):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.path = path
+        self.key = key
+        self.rate = rate
+        self.lease_size = lease_size
+        self._slots: Deque[float] = deque()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._lease_lock: Optional[asyncio.Lock] = None
+        # Pause of this process, honoured by its leases before the database has it
+        self._paused_until = 0.0
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_connection'], state['_lock'], state['_lease_lock']
+        state['_slots'] = deque()
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._connection = None
+        self._lock = threading.Lock()
+        self._lease_lock = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False,
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tat REAL NOT NULL)'
+            )
+        return self._connection
+
+    def _advance(self, at_least: float, span: float) -> float:
+        with self._lock:
+            connection = self._connect()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = connection.execute('SELECT tat FROM buckets WHERE key = ?', (self.key,)).fetchone()
+                start = max(row[0] if row else 0.0, at_least)
+                connection.execute(
+                    'INSERT OR REPLACE INTO buckets (key, tat) VALUES (?, ?)', (self.key, start + span),
+                )
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+            return start
+
+    def _lease(self) -> List[float]:
+        interval = 1 / self.rate
+        start = self._advance(max(time.time(), self._paused_until), self.lease_size * interval)
+        return [start + i * interval for i in range(self.lease_size)]
+
+    def set_rate(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+
+    def pause(self, until: float) -> None:
+        """
+        Move the shared arrival time to ``until``. The database may be locked
+        by other processes, it is written in the default executor
+        """
+        self._slots.clear()
+        self._paused_until = max(self._paused_until, until)
+        future = asyncio.get_event_loop().run_in_executor(None, self._advance, until, 0.0)
+        future.add_done_callback(self._paused)
+
+    def _paused(self, future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f'Bucket {self.key}: could not share a pause', exc_info=future.exception())
+
+    async def acquire(self) -> None:
+        if self._lease_lock is None:
+            self._lease_lock = asyncio.Lock()
+        # Slots leased for us may be taken by other callers before we resume
+        while not self._slots:
+            async with self._lease_lock:
+                if not self._slots:
+                    slots = await asyncio.get_event_loop().run_in_executor(None, self._lease)
+                    self._slots.extend(slots)
+        slot = self._slots.popleft()
+        delay = slot - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    :class:`RateLimiter` whose global limit is shared by every process using
+    the same SQLite ``path`` and ``key`` (usually one key per bot).
+    Per-chat limits stay local: a chat is handled by a single process
+    """
+
+    def __init__(
+            self,
+            path: str,
+            key: str = 'default',
+            rate: float = 30.0,
+            chat_rate: Optional[float] = 1.0,
+            group_rate: Optional[float] = 20 / 60,
+            lease_size: int = 5,
+            **kwargs,
+    ):
+        super().__init__(rate=rate, chat_rate=chat_rate, group_rate=group_rate, **kwargs)
+        self._bucket = SQLiteTokenBucket(path, key, rate, lease_size)
+
+    def on_retry_after(self, timeout: float) -> None:
+        super().on_retry_after(timeout)
+        self._bucket.pause(time.time() + timeout)
@@ -0,0 +1,131 @@
+from array import array
+from itertools import compress
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .types import ChatIdType
+
+PENDING = 0
+SUCCESSFUL = 1
+FAILED = 2
+
+_MISSING = object()
+
+
+class RecipientStore:
+    """
+    Columnar storage of broadcast recipients.
+
+    Chat ids live in an ``array('q')`` (a plain list once a non-integer id,
+    such as a channel username, shows up), ``kwargs`` shared by all chats
+    are kept once, and per-chat variables get a column only when some chat
+    has them. Outcomes are a single status byte per chat, and the id of the
+    sent message an ``int64`` (0 while nothing was sent).
+    """
+
+    def __init__(self, kwargs: Optional[Dict] = None):
+        self.kwargs = kwargs or {}
+        self.chat_ids: Union[array, List[ChatIdType]] = array('q')
+        self.variables: Dict[str, List] = {}
+        self.status = bytearray()
+        self.message_ids = array('q')
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def append(self, chat_id: ChatIdType, variables: Optional[Dict] = None) -> int:
+        index = len(self.status)
+        try:
+            self.chat_ids.append(chat_id)
+        except (TypeError, OverflowError):
+            self.chat_ids = list(self.chat_ids)
+            self.chat_ids.append(chat_id)
+
+        if variables:
+            for key, value in variables.items():
+                if key == 'chat_id':
+                    continue
+                column = self.variables.get(key)
+                if column is None:
+                    column = self.variables[key] = [_MISSING] * index
+                column.append(value)
+        for column in self.variables.values():
+            if len(column) == index:
+                column.append(_MISSING)
+
+        self.status.append(PENDING)
+        self.message_ids.append(0)
+        return index
+
+    def extend(self, chat_ids: Sequence[ChatIdType]) -> None:
+        """Bulk append of chats without variables"""
+        if isinstance(self.chat_ids, array):
+            try:
+                chat_ids = array('q', chat_ids)
+            except (TypeError, OverflowError):
+                self.chat_ids = list(self.chat_ids)
+        self.chat_ids.extend(chat_ids)
+        for column in self.variables.values():
+            column.extend([_MISSING] * len(chat_ids))
+        self.status.extend(bytes(len(chat_ids)))
+        self.message_ids.frombytes(bytes(self.message_ids.itemsize * len(chat_ids)))
+
+    def update(self, index: int, variables: Dict) -> None:
+        """Overwrite variables of a stored chat, like ``dict.update``"""
+        for key, value in variables.items():
+            if key == 'chat_id':
+                continue
+            column = self.variables.get(key)
+            if column is None:
+                column = self.variables[key] = [_MISSING] * len(self.status)
+            column[index] = value
+
+    def chat(self, index: int) -> Dict:
+        chat = {'chat_id': self.chat_ids[index]}
+        for key, column in self.variables.items():
+            value = column[index]
+            if value is not _MISSING:
+                chat[key] = value
+        chat.update(self.kwargs)
+        return chat
+
+    def has_variable(self, key: str) -> bool:
+        """Whether every chat has a value for ``key``, either its own or from kwargs"""
+        if key in self.kwargs:
+            return True
+        column = self.variables.get(key)
+        return column is not None and _MISSING not in column
+
+    def set_status(self, index: int, status: int) -> None:
+        self.status[index] = status
+
+    def set_message_id(self, index: int, message_id: int) -> None:
+        self.message_ids[index] = message_id
+
+    def count(self, status: int) -> int:
+        return self.status.count(status)
+
+    def _mask(self, status: int) -> bytes:
+        table = bytearray(256)
+        table[status] = 1
+        return self.status.translate(table)
+
+    def indices(self, status: int) -> Sequence[int]:
+        return array('q', compress(range(len(self.status)), self._mask(status)))
+
+    def ids(self, status: int) -> Union[array, List[ChatIdType]]:
+        """Chat ids with the given status, filtered without touching per-chat Python objects"""
+        ids = compress(self.chat_ids, self._mask(status))
+        if isinstance(self.chat_ids, array):
+            return array('q', ids)
+        return list(ids)
+
+    def chats(self, status: int) -> List[Dict]:
+        return [self.chat(index) for index in self.indices(status)]
+
+    def sent_messages(self) -> List[Tuple[ChatIdType, int]]:
+        """``(chat_id, message_id)`` of every successfully sent message"""
+        return [
+            (chat_id, message_id)
+            for chat_id, message_id in compress(zip(self.chat_ids, self.message_ids), self._mask(SUCCESSFUL))
+            if message_id
+        ]
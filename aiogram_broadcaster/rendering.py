@@ -0,0 +1,178 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from string import Template
+from typing import AsyncIterator, Callable, Dict, FrozenSet, Hashable, List, Optional, Tuple, Union
+
+RenderFunction = Callable[[Dict], Dict]
+RenderedChat = Tuple[int, Dict]
+
+
+def template_identifiers(template: Template) -> FrozenSet[str]:
+    return frozenset(
+        match.group('named') or match.group('braced')
+        for match in template.pattern.finditer(template.template)
+        if match.group('named') or match.group('braced')
+    )
+
+
+class Renderer:
+    """
+    Builds the per-chat send arguments (payload) from the chat variables.
+
+    ``templates`` maps send arguments to templates, ``render`` may add any
+    other argument, such as a keyboard built from the chat variables. It is
+    picklable, so it can run in a process pool, as long as ``render`` is.
+    """
+
+    def __init__(self, templates: Dict[str, Template], render: Optional[RenderFunction] = None):
+        self.templates = templates
+        self.render = render
+        if render is None:
+            # Chats that agree on these variables get the same payload
+            self.variables: Optional[Tuple[str, ...]] = tuple(sorted(frozenset().union(
+                *map(template_identifiers, templates.values())
+            )))
+        else:
+            self.variables = None
+
+    def key(self, chat_args: Dict) -> Optional[Hashable]:
+        """Cache key of the payload of a chat, None when it can't be cached"""
+        if self.variables is None:
+            key = tuple(sorted(chat_args.items()))
+        else:
+            key = tuple((name, chat_args[name]) for name in self.variables if name in chat_args)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def __call__(self, chat_args: Dict) -> Dict:
+        payload = {field: template.safe_substitute(chat_args) for field, template in self.templates.items()}
+        if self.render is not None:
+            payload.update(self.render(chat_args))
+        return payload
+
+
+def render_batch(renderer: Renderer, chats: List[Dict]) -> List[Dict]:
+    return [renderer(chat_args) for chat_args in chats]
+
+
+class RenderPipeline:
+    """
+    Renders payloads ahead of the senders into a bounded buffer.
+
+    Chats are rendered in chunks of ``chunk_size``; at most ``buffer_size``
+    rendered payloads wait for a sender. Chats with the same template
+    variables share one cached payload, up to ``cache_size`` of them, so
+    identical payloads are rendered once. With ``executor`` set to
+    ``'thread'``, ``'process'`` or an ``Executor`` instance, rendering runs
+    off the event loop and the senders only do network I/O.
+    """
+
+    def __init__(
+            self,
+            executor: Union[str, Executor, None] = None,
+            workers: Optional[int] = None,
+            buffer_size: int = 1000,
+            chunk_size: int = 100,
+            cache_size: int = 10000,
+    ):
+        if isinstance(executor, str) and executor not in ('thread', 'process'):
+            raise ValueError('executor must be "thread", "process" or an Executor instance')
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be a positive integer')
+        self.executor = executor
+        self.workers = workers
+        self.buffer_size = buffer_size
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self._owned_executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.executor is None or isinstance(self.executor, Executor):
+            return self.executor
+        if self._owned_executor is None:
+            executor_class = ThreadPoolExecutor if self.executor == 'thread' else ProcessPoolExecutor
+            self._owned_executor = executor_class(self.workers)
+        return self._owned_executor
+
+    async def _render(self, renderer: Renderer, chats: List[Dict]) -> List[Dict]:
+        executor = self._get_executor()
+        if executor is None or not chats:
+            return render_batch(renderer, chats)
+        return await asyncio.get_event_loop().run_in_executor(executor, render_batch, renderer, chats)
+
+    async def _render_chunk(
+            self,
+            renderer: Renderer,
+            chunk: List[Tuple[int, Dict]],
+            cache: 'OrderedDict[Hashable, Dict]',
+    ) -> List[RenderedChat]:
+        keys = [renderer.key(chat_args) for _, chat_args in chunk]
+        payloads: Dict[Hashable, Dict] = {}
+        missing: Dict[Hashable, Dict] = {}
+        uncached = []
+        for (_, chat_args), key in zip(chunk, keys):
+            if key is None:
+                uncached.append(chat_args)
+            elif key in payloads or key in missing:
+                continue
+            elif key in cache:
+                cache.move_to_end(key)
+                payloads[key] = cache[key]
+            else:
+                missing[key] = chat_args
+
+        rendered = iter(await self._render(renderer, [*missing.values(), *uncached]))
+        for key in missing:
+            payloads[key] = cache[key] = next(rendered)
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return [
+            (index, payloads[key] if key is not None else next(rendered))
+            for (index, _), key in zip(chunk, keys)
+        ]
+
+    async def stream(
+            self,
+            renderer: Renderer,
+            chats: AsyncIterator[Tuple[int, Dict]],
+    ) -> AsyncIterator[RenderedChat]:
+        """Yield ``(index, payload)`` for every ``(index, chat_args)`` of ``chats``, rendered ahead"""
+        queue = asyncio.Queue(maxsize=max(1, self.buffer_size // self.chunk_size))
+        cache: 'OrderedDict[Hashable, Dict]' = OrderedDict()
+
+        async def produce() -> None:
+            try:
+                chunk = []
+                async for chat in chats:
+                    chunk.append(chat)
+                    if len(chunk) >= self.chunk_size:
+                        await queue.put(await self._render_chunk(renderer, chunk, cache))
+                        chunk = []
+                if chunk:
+                    await queue.put(await self._render_chunk(renderer, chunk, cache))
+                await queue.put(None)
+            except Exception as e:
+                await queue.put(e)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                rendered = await queue.get()
+                if rendered is None:
+                    return
+                if isinstance(rendered, Exception):
+                    raise rendered
+                for item in rendered:
+                    yield item
+        finally:
+            producer.cancel()
+
+    def close(self) -> None:
+        """Shut down the pool created by the pipeline, if any"""
+        if self._owned_executor is not None:
+            self._owned_executor.shutdown()
+            self._owned_executor = None
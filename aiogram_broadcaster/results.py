@@ -0,0 +1,193 @@
+import abc
+import asyncio
+import csv
+import json
+import logging
+import os
+import sqlite3
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Union
+
+from .types import ChatIdType
+
+logger = logging.getLogger(__name__)
+
+
+class BroadcastResult(NamedTuple):
+    # Unique id of the run, shared sinks never mix up two broadcasts
+    broadcast_id: str
+    campaign: Optional[str]
+    chat_id: ChatIdType
+    message_id: Optional[int]
+    error: Optional[str]
+    latency: float
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+ResultCallback = Callable[[List[BroadcastResult]], Union[None, Awaitable[None]]]
+
+
+class BaseResultSink(abc.ABC):
+    """
+    Receives the outcome of every send.
+
+    Results are buffered and handed to ``_write`` in batches by a background
+    task, once ``batch_size`` results have accumulated or ``flush_interval``
+    seconds have passed, so recording a result never waits on I/O. Blocking
+    writes run in the default executor.
+    """
+
+    def __init__(self, batch_size: int = 1000, flush_interval: float = 1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[BroadcastResult] = []
+        self._full: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Future] = None
+        self._stopping = False
+        self._users = 0
+
+    def start(self) -> None:
+        """Start the background flushing task, a sink shared by several broadcasts runs one task"""
+        self._users += 1
+        if self._task is not None:
+            return
+        self._full = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.ensure_future(self._flush_periodically())
+
+    def record(self, result: BroadcastResult) -> None:
+        self._buffer.append(result)
+        if len(self._buffer) >= self.batch_size and self._full is not None:
+            self._full.set()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # The batch is dropped, memory stays flat and later batches are still written
+                logger.exception(f'{self.__class__.__name__}: could not write a batch of results')
+            if self._stopping:
+                return
+
+    async def flush(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            await self._write_batch(batch)
+
+    async def stop(self) -> None:
+        """Write out what is left, the background task ends with the last broadcast using the sink"""
+        self._users = max(0, self._users - 1)
+        if self._task is not None and not self._users:
+            self._stopping = True
+            self._full.set()
+            task, self._task = self._task, None
+            await task
+        await self.flush()
+
+    async def close(self) -> None:
+        self._users = min(self._users, 1)
+        await self.stop()
+        self._close()
+
+    async def _write_batch(self, batch: List[BroadcastResult]) -> None:
+        await asyncio.get_event_loop().run_in_executor(None, self._write, batch)
+
+    @abc.abstractmethod
+    def _write(self, batch: List[BroadcastResult]) -> None:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+
+class SQLiteResultSink(BaseResultSink):
+    def __init__(self, path: str, batch_size: int = 1000, flush_interval: float = 1.0):
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __getstate__(self) -> Dict:
+        # Partitioned workers open their own connection to the same file
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        return state
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results (broadcast_id TEXT NOT NULL, campaign TEXT, chat_id NOT NULL, '
+                'message_id INTEGER, error TEXT, latency REAL NOT NULL)'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS results_chat_id ON results (broadcast_id, chat_id)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS results_campaign ON results (campaign, chat_id)')
+            self._connection.commit()
+        return self._connection
+
+    def _write(self, batch: List[BroadcastResult]) -> None:
+        connection = self._connect()
+        with connection:
+            connection.executemany('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)', batch)
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class CSVResultSink(BaseResultSink):
+    def __init__(self, path: str, batch_size: int = 1000, flush_interval: float = 1.0):
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        self.path = path
+
+    def _write(self, batch: List[BroadcastResult]) -> None:
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            if new_file:
+                writer.writerow(BroadcastResult._fields)
+            writer.writerows(batch)
+
+
+class JSONLResultSink(BaseResultSink):
+    def __init__(self, path: str, batch_size: int = 1000, flush_interval: float = 1.0):
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        self.path = path
+
+    def _write(self, batch: List[BroadcastResult]) -> None:
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.writelines(json.dumps(result._asdict()) + '\n' for result in batch)
+
+
+class CallbackResultSink(BaseResultSink):
+    """
+    Hands every batch to ``callback``. A coroutine function is awaited,
+    a plain function is called in the default executor
+    """
+
+    def __init__(self, callback: ResultCallback, batch_size: int = 1000, flush_interval: float = 1.0):
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        self.callback = callback
+
+    async def _write_batch(self, batch: List[BroadcastResult]) -> None:
+        if asyncio.iscoroutinefunction(self.callback):
+            await self.callback(batch)
+        else:
+            await super()._write_batch(batch)
+
+    def _write(self, batch: List[BroadcastResult]) -> None:
+        self.callback(batch)
@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import heapq
+import itertools
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .base import BaseBroadcaster
+from .rate_limiter import RateLimiter
+
+
+class ScheduledRateLimiter(RateLimiter):
+    """
+    Per-broadcast view of a :class:`BroadcastScheduler`.
+    Per-chat limits stay with the broadcast, the global limit, flood pauses
+    and the adaptive rate are shared by every broadcast of the scheduler
+    """
+
+    def __init__(
+            self,
+            scheduler: 'BroadcastScheduler',
+            weight: float = 1.0,
+            priority: int = 0,
+            chat_rate: Optional[float] = 1.0,
+            group_rate: Optional[float] = 20 / 60,
+    ):
+        if weight <= 0:
+            raise ValueError('weight must be positive')
+        super().__init__(rate=None, chat_rate=chat_rate, group_rate=group_rate)
+        self.scheduler = scheduler
+        self.weight = weight
+        self.priority = priority
+        self.virtual_time = 0.0
+
+    @property
+    def effective_rate(self) -> Optional[float]:
+        return self.scheduler.rate_limiter.effective_rate
+
+    @property
+    def paused_for(self) -> float:
+        return self.scheduler.rate_limiter.paused_for
+
+    async def acquire_global(self) -> None:
+        await self.scheduler.grant(self)
+        await self._wait_pause()
+
+    def on_retry_after(self, timeout: float) -> None:
+        self.scheduler.rate_limiter.on_retry_after(timeout)
+
+    def on_success(self) -> None:
+        self.scheduler.rate_limiter.on_success()
+
+
+class ScheduledBroadcast(NamedTuple):
+    broadcaster: BaseBroadcaster
+    task: asyncio.Future
+    rate_limiter: ScheduledRateLimiter
+
+
+class BroadcastScheduler:
+    """
+    Owns every broadcast of one bot and shares a single rate budget between them.
+
+    Global tokens are handed out by weighted fair queuing: each broadcast
+    gets a share proportional to its ``weight``. A broadcast with a higher
+    ``priority`` is always served first, so an urgent alert preempts long
+    mailings, which continue once it has nothing left to send.
+
+    Finished broadcasts are dropped, only the tasks of the last
+    ``history_size`` of them are kept for ``status`` and ``wait``.
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None, history_size: int = 100):
+        self.rate_limiter = rate_limiter or RateLimiter(chat_rate=None, group_rate=None)
+        self.history_size = history_size
+        self.broadcasts: Dict[int, ScheduledBroadcast] = {}
+        self.history: 'OrderedDict[int, asyncio.Future]' = OrderedDict()
+        self._waiters: List[Tuple[int, float, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._dispatcher: Optional[asyncio.Future] = None
+
+    async def grant(self, share: ScheduledRateLimiter) -> None:
+        finish = max(self._virtual_time, share.virtual_time) + 1 / share.weight
+        share.virtual_time = finish
+        waiter = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (-share.priority, finish, next(self._sequence), waiter))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await waiter
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            await self.rate_limiter.acquire_global()
+            while self._waiters:
+                _, finish, _, waiter = heapq.heappop(self._waiters)
+                if not waiter.done():
+                    self._virtual_time = finish
+                    waiter.set_result(None)
+                    break
+
+    def submit(self, broadcaster: BaseBroadcaster, weight: float = 1.0, priority: int = 0) -> int:
+        """Start the broadcast under this scheduler and return its id"""
+        if broadcaster._id in self.broadcasts:
+            raise ValueError(f'Broadcast {broadcaster._id} is already scheduled')
+        rate_limiter = ScheduledRateLimiter(
+            self,
+            weight=weight,
+            priority=priority,
+            chat_rate=broadcaster.rate_limiter.chat_rate,
+            group_rate=broadcaster.rate_limiter.group_rate,
+        )
+        broadcaster.rate_limiter = rate_limiter
+        task = asyncio.ensure_future(broadcaster.run())
+        self.broadcasts[broadcaster._id] = ScheduledBroadcast(broadcaster, task, rate_limiter)
+        task.add_done_callback(functools.partial(self._finished, broadcaster._id))
+        return broadcaster._id
+
+    def _finished(self, broadcast_id: int, task: asyncio.Future) -> None:
+        # The broadcaster and its recipients are released, only the task is kept
+        self.broadcasts.pop(broadcast_id, None)
+        self.history[broadcast_id] = task
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+
+    def _task(self, broadcast_id: int) -> asyncio.Future:
+        scheduled = self.broadcasts.get(broadcast_id)
+        if scheduled is not None:
+            return scheduled.task
+        return self.history[broadcast_id]
+
+    def pause(self, broadcast_id: int) -> None:
+        self.broadcasts[broadcast_id].broadcaster.pause()
+
+    def resume(self, broadcast_id: int) -> None:
+        self.broadcasts[broadcast_id].broadcaster.unpause()
+
+    def cancel(self, broadcast_id: int) -> None:
+        self._task(broadcast_id).cancel()
+
+    def set_priority(self, broadcast_id: int, priority: int, weight: Optional[float] = None) -> None:
+        rate_limiter = self.broadcasts[broadcast_id].rate_limiter
+        rate_limiter.priority = priority
+        if weight is not None:
+            rate_limiter.weight = weight
+
+    async def wait(self, broadcast_id: Optional[int] = None) -> None:
+        """Wait for one broadcast, or for all of them. Cancelled broadcasts are not an error"""
+        if broadcast_id is not None:
+            tasks = [self._task(broadcast_id)]
+        else:
+            tasks = [*self.history.values(), *(scheduled.task for scheduled in self.broadcasts.values())]
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
+                raise result
+
+    def status(self, broadcast_id: int) -> str:
+        task = self._task(broadcast_id)
+        if task.cancelled():
+            return 'cancelled'
+        if task.done():
+            return 'failed' if task.exception() else 'done'
+        return 'paused' if self.broadcasts[broadcast_id].broadcaster.is_paused else 'running'
@@ -0,0 +1,129 @@
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.types import Message, ParseMode
+
+from .types import ChatIdType, MarkupType
+
+# (bot method name, content specific arguments, name of the text argument or None)
+ContentPlan = Tuple[str, Dict, Optional[str]]
+
+
+class SendPlan(NamedTuple):
+    """
+    Bound bot method with every argument that does not depend on the recipient.
+    Only ``chat_id`` and, optionally, the rendered text are added per send
+    """
+    method: Callable[..., Awaitable[Message]]
+    kwargs: Dict
+    text_field: Optional[str] = None
+
+    async def send(self, chat_id: ChatIdType, text: Optional[str] = None) -> Message:
+        if text is None or self.text_field is None:
+            return await self.method(chat_id=chat_id, **self.kwargs)
+        return await self.method(chat_id=chat_id, **{**self.kwargs, self.text_field: text})
+
+    async def send_payload(self, chat_id: ChatIdType, payload: Dict) -> Message:
+        """Send with per-chat arguments on top of the planned ones"""
+        if not payload:
+            return await self.method(chat_id=chat_id, **self.kwargs)
+        return await self.method(chat_id=chat_id, **{**self.kwargs, **payload})
+
+
+# Checked in order, the first attribute present on the message wins.
+# Append to this list to support another content type.
+CONTENT_PLANS: List[Tuple[str, Callable[[Message], ContentPlan]]] = [
+    ('text', lambda message: ('send_message', {}, 'text')),
+    ('audio', lambda message: ('send_audio', {
+        'audio': message.audio.file_id,
+        'title': message.audio.title,
+        'performer': message.audio.performer,
+        'duration': message.audio.duration,
+    }, 'caption')),
+    ('animation', lambda message: ('send_animation', {'animation': message.animation.file_id}, 'caption')),
+    ('document', lambda message: ('send_document', {'document': message.document.file_id}, 'caption')),
+    ('photo', lambda message: ('send_photo', {'photo': message.photo[-1].file_id}, 'caption')),
+    ('sticker', lambda message: ('send_sticker', {'sticker': message.sticker.file_id}, None)),
+    ('video', lambda message: ('send_video', {'video': message.video.file_id}, 'caption')),
+    ('video_note', lambda message: ('send_video_note', {'video_note': message.video_note.file_id}, None)),
+    ('voice', lambda message: ('send_voice', {'voice': message.voice.file_id}, 'caption')),
+    ('contact', lambda message: ('send_contact', {
+        'phone_number': message.contact.phone_number,
+        'first_name': message.contact.first_name,
+        'last_name': message.contact.last_name,
+        'vcard': message.contact.vcard,
+    }, None)),
+    ('venue', lambda message: ('send_venue', {
+        'latitude': message.venue.location.latitude,
+        'longitude': message.venue.location.longitude,
+        'title': message.venue.title,
+        'address': message.venue.address,
+        'foursquare_id': message.venue.foursquare_id,
+        'foursquare_type': message.venue.foursquare_type,
+    }, None)),
+    ('location', lambda message: ('send_location', {
+        'latitude': message.location.latitude,
+        'longitude': message.location.longitude,
+    }, None)),
+    ('poll', lambda message: ('send_poll', {
+        'question': message.poll.question,
+        'options': [option.text for option in message.poll.options],
+        'is_anonymous': message.poll.is_anonymous,
+        'allows_multiple_answers': message.poll.allows_multiple_answers,
+    }, None)),
+    ('dice', lambda message: ('send_dice', {'emoji': message.dice.emoji}, None)),
+]
+
+
+def build_send_plan(
+        bot: Bot,
+        message: Message,
+        text: Optional[str] = None,
+        disable_notification: Optional[bool] = None,
+        disable_web_page_preview: Optional[bool] = None,
+        reply_to_message_id: Optional[int] = None,
+        allow_sending_without_reply: Optional[bool] = None,
+        reply_markup: MarkupType = None,
+) -> SendPlan:
+    kwargs = {
+        'allow_sending_without_reply': allow_sending_without_reply,
+        'reply_markup': reply_markup or message.reply_markup,
+        'disable_notification': disable_notification,
+        'reply_to_message_id': reply_to_message_id,
+    }
+    for attribute, content_plan in CONTENT_PLANS:
+        if getattr(message, attribute):
+            method_name, content_kwargs, text_field = content_plan(message)
+            break
+    else:
+        raise TypeError("This type of message can't be copied.")
+
+    kwargs.update(content_kwargs)
+    if text_field is not None:
+        kwargs['parse_mode'] = ParseMode.HTML
+        kwargs[text_field] = text
+    if text_field == 'text':
+        kwargs['disable_web_page_preview'] = disable_web_page_preview
+    return SendPlan(getattr(bot, method_name), kwargs, text_field)
+
+
+def build_copy_plan(
+        bot: Bot,
+        message: Message,
+        disable_notification: Optional[bool] = None,
+        reply_to_message_id: Optional[int] = None,
+        allow_sending_without_reply: Optional[bool] = None,
+        reply_markup: MarkupType = None,
+) -> SendPlan:
+    """
+    Single ``copyMessage`` call for any content type. Usable only when the text
+    is not personalised and the bot can still access the original message
+    """
+    return SendPlan(bot.copy_message, {
+        'from_chat_id': message.chat.id,
+        'message_id': message.message_id,
+        'allow_sending_without_reply': allow_sending_without_reply,
+        'reply_markup': reply_markup or message.reply_markup,
+        'disable_notification': disable_notification,
+        'reply_to_message_id': reply_to_message_id,
+    })
@@ -0,0 +1,24 @@
+import hashlib
+
+from .base import BaseBroadcaster
+
+
+class SentMessageBroadcaster(BaseBroadcaster):
+    """
+    Base of the broadcasters acting on previously sent messages, every chat
+    needs a ``message_id`` (see ``get_sent_messages``).
+
+    Several messages of one chat may be edited or deleted, so repeated chat
+    ids are kept by default and every message has its own outcome in the
+    progress store and its own entry in the delivered set of a campaign.
+    ``AlbumBroadcaster`` only records the id of the first item of an album,
+    the other items can not be edited or deleted this way.
+    """
+
+    def _progress_key(self, index: int) -> str:
+        return f"{self.recipients.chat_ids[index]}:{self.recipients.chat(index)['message_id']}"
+
+    def _delivery_key(self, index: int) -> int:
+        # Delivered sets hold int64 keys, too few bits for both ids
+        digest = hashlib.blake2b(self._progress_key(index).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
@@ -0,0 +1,50 @@
+from typing import NamedTuple, Optional
+
+import aiohttp
+from aiogram import Bot
+
+
+class SessionConfig(NamedTuple):
+    """
+    HTTP settings of the bot session.
+
+    ``limit`` is the connection pool size, by default the concurrency of the
+    broadcaster so every worker keeps its own connection alive instead of
+    queueing or opening new TLS handshakes. Timeouts are in seconds and
+    apply to each Bot API request.
+    """
+    limit: Optional[int] = None
+    limit_per_host: int = 0
+    keepalive_timeout: float = 30.0
+    use_dns_cache: bool = True
+    ttl_dns_cache: Optional[int] = 300
+    total_timeout: Optional[float] = 60.0
+    connect_timeout: Optional[float] = 10.0
+    sock_read_timeout: Optional[float] = None
+
+
+def configure_bot(bot: Bot, config: SessionConfig, concurrency: int = 1) -> None:
+    """
+    Apply ``config`` to the connector and timeouts of ``bot``.
+    An already open session keeps its settings until it is closed
+    """
+    # aiogram 2 creates its connector from these arguments on the next session
+    bot._connector_init.update(
+        limit=config.limit if config.limit is not None else concurrency,
+        limit_per_host=config.limit_per_host,
+        keepalive_timeout=config.keepalive_timeout,
+        use_dns_cache=config.use_dns_cache,
+        ttl_dns_cache=config.ttl_dns_cache,
+    )
+    bot.timeout = aiohttp.ClientTimeout(
+        total=config.total_timeout,
+        connect=config.connect_timeout,
+        sock_read=config.sock_read_timeout,
+    )
+
+
+async def close_session(bot: Bot) -> None:
+    """Close the HTTP session of ``bot`` if it has one, the bot can still be used afterwards"""
+    session = bot._session
+    if session is not None and not session.closed:
+        await session.close()
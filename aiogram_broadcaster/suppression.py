@@ -0,0 +1,147 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .types import ChatIdType
+
+SuppressionKey = Tuple[int, ChatIdType]
+
+
+class SuppressionIndex:
+    """
+    Chats that permanently failed (blocked the bot, not found, deactivated).
+
+    Broadcasters pass over suppressed chats without spending an API call or
+    a rate limit token. The set is read from SQLite into a dict by ``load``,
+    so a lookup is a single dict access and no query runs on the event
+    loop. Entries older than ``ttl`` seconds are sent to again: a new
+    permanent failure renews them and a success removes them.
+
+    Entries are per bot, as a user blocks one bot and not the others. The
+    index can be shared between processes through the SQLite file.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            ttl: Optional[float] = 30 * 24 * 60 * 60,
+            batch_size: int = 1000,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.batch_size = batch_size
+        # Suppressed key -> time it was added, None until loaded
+        self._entries: Optional[Dict[SuppressionKey, float]] = None
+        self._pending: Dict[SuppressionKey, Optional[Tuple[str, float]]] = {}
+        self._writing: Dict[SuppressionKey, Optional[Tuple[str, float]]] = {}
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_connection'], state['_lock'], state['_flush_lock']
+        state.update(_entries=None, _pending={}, _writing={})
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._connection = None
+        self._lock = threading.Lock()
+        self._flush_lock = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS suppressed ('
+                'bot_id INTEGER NOT NULL, chat_id NOT NULL, reason TEXT NOT NULL, added_at REAL NOT NULL, '
+                'PRIMARY KEY (bot_id, chat_id))'
+            )
+            self._connection.commit()
+        return self._connection
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._entries is not None
+
+    def load(self) -> None:
+        """Read the suppressed chats of every bot"""
+        with self._lock:
+            connection = self._connect()
+            entries = {
+                (bot_id, chat_id): added_at
+                for bot_id, chat_id, added_at in connection.execute(
+                    'SELECT bot_id, chat_id, added_at FROM suppressed'
+                )
+            }
+        # Changes not written yet win over the database
+        for key, entry in [*self._writing.items(), *self._pending.items()]:
+            if entry is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = entry[1]
+        self._entries = entries
+
+    def is_suppressed(self, bot_id: int, chat_id: ChatIdType) -> bool:
+        if self._entries is None:
+            self.load()
+        added_at = self._entries.get((bot_id, chat_id))
+        if added_at is None:
+            return False
+        return self.ttl is None or time.time() - added_at < self.ttl
+
+    async def add(self, bot_id: int, chat_id: ChatIdType, reason: str) -> None:
+        if self._entries is None:
+            self.load()
+        added_at = time.time()
+        self._entries[(bot_id, chat_id)] = added_at
+        self._pending[(bot_id, chat_id)] = (reason, added_at)
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def discard(self, bot_id: int, chat_id: ChatIdType) -> None:
+        """Forget a chat that accepted a message again"""
+        if self._entries is None or self._entries.pop((bot_id, chat_id), None) is None:
+            return
+        self._pending[(bot_id, chat_id)] = None
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    def _write(self, batch: Dict[SuppressionKey, Optional[Tuple[str, float]]]) -> None:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO suppressed (bot_id, chat_id, reason, added_at) VALUES (?, ?, ?, ?)',
+                    ((*key, *entry) for key, entry in batch.items() if entry is not None),
+                )
+                connection.executemany(
+                    'DELETE FROM suppressed WHERE bot_id = ? AND chat_id = ?',
+                    (key for key, entry in batch.items() if entry is None),
+                )
+
+    async def flush(self) -> None:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            self._writing, self._pending = self._pending, {}
+            try:
+                await asyncio.get_event_loop().run_in_executor(None, self._write, self._writing)
+            except BaseException:
+                # Keep the batch, newer entries win
+                self._pending = {**self._writing, **self._pending}
+                raise
+            finally:
+                self._writing = {}
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
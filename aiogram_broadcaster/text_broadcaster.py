@@ -1,12 +1,19 @@
-from asyncio import sleep
 from string import Template
-from typing import Dict, Optional, Union
+from typing import Dict, List, Optional, Union
 
 from aiogram import Bot
-from aiogram.utils import exceptions
+from aiogram.types import Message
 
 from .types import ChatsType, MarkupType, TextType, ChatIdType
 from .base import BaseBroadcaster
+from .delivery import DeliveryLog
+from .metrics import BroadcastObserver
+from .progress import BaseProgressStore
+from .rate_limiter import RateLimiter
+from .rendering import RenderFunction, RenderPipeline, Renderer
+from .results import BaseResultSink
+from .session import SessionConfig
+from .suppression import SuppressionIndex
 
 
 class TextBroadcaster(BaseBroadcaster):
@@ -23,7 +30,20 @@ class TextBroadcaster(BaseBroadcaster):
             reply_markup: MarkupType = None,
             bot: Optional[Bot] = None,
             bot_token: Optional[str] = None,
-            timeout: float = 0.02,
+            timeout: Optional[float] = None,
+            concurrency: int = 1,
+            rate_limiter: Optional[RateLimiter] = None,
+            max_retries: int = 5,
+            progress_store: Optional[BaseProgressStore] = None,
+            observers: Optional[List[BroadcastObserver]] = None,
+            suppression_index: Optional[SuppressionIndex] = None,
+            result_sink: Optional[BaseResultSink] = None,
+            session_config: Optional[SessionConfig] = None,
+            render: Optional[RenderFunction] = None,
+            render_pipeline: Optional[RenderPipeline] = None,
+            campaign: Optional[str] = None,
+            delivery_log: Optional[DeliveryLog] = None,
+            duplicates: Optional[str] = 'first',
             logger=__name__,
     ):
         super().__init__(
@@ -36,11 +56,25 @@ class TextBroadcaster(BaseBroadcaster):
             bot=bot,
             bot_token=bot_token,
             timeout=timeout,
+            concurrency=concurrency,
+            rate_limiter=rate_limiter,
+            max_retries=max_retries,
+            progress_store=progress_store,
+            observers=observers,
+            suppression_index=suppression_index,
+            result_sink=result_sink,
+            session_config=session_config,
+            render_pipeline=render_pipeline,
+            campaign=campaign,
+            delivery_log=delivery_log,
+            duplicates=duplicates,
             logger=logger,
         )
         self.text = Template(text) if isinstance(text, str) else text
         self.parse_mode = parse_mode
         self.disable_web_page_preview = disable_web_page_preview
+        # render may add per-chat arguments, e.g. a reply_markup built from the chat variables
+        self.renderer = Renderer({'text': self.text}, render)
 
     def get_text(self, as_str: bool = True) -> Union[str, Template]:
         if as_str:
@@ -48,38 +82,21 @@ class TextBroadcaster(BaseBroadcaster):
         else:
             return self.text
 
-    async def send(
+    async def _send(
             self,
             chat_id: ChatIdType,
             chat_args: Dict,
-    ) -> bool:
-        try:
-            await self.bot.send_message(
-                chat_id=chat_id,
-                text=self.text.safe_substitute(chat_args),
-                parse_mode=self.parse_mode,
-                disable_web_page_preview=self.disable_web_page_preview,
-                disable_notification=self.disable_notification,
-                reply_to_message_id=self.reply_to_message_id,
-                allow_sending_without_reply=self.allow_sending_without_reply,
-                reply_markup=self.reply_markup,
-            )
-        except exceptions.RetryAfter as e:
-            self.logger.debug(
-                f"Target [ID:{chat_id}]: Flood limit is exceeded. Sleep {e.timeout} seconds."
-            )
-            await sleep(e.timeout)
-            return await self.send(chat_id, chat_args)  # Recursive call
-        except (
-                exceptions.BotBlocked,
-                exceptions.ChatNotFound,
-                exceptions.UserDeactivated,
-                exceptions.ChatNotFound
-        ) as e:
-            self.logger.debug(f"Target [ID:{chat_id}]: {e.match}")
-        except exceptions.TelegramAPIError:
-            self.logger.exception(f"Target [ID:{chat_id}]: failed")
-        else:
-            self.logger.debug(f"Target [ID:{chat_id}]: success")
-            return True
-        return False
+    ) -> Message:
+        return await self._send_rendered(chat_id, self.renderer(chat_args))
+
+    async def _send_rendered(self, chat_id: ChatIdType, payload: Dict) -> Message:
+        kwargs = dict(
+            parse_mode=self.parse_mode,
+            disable_web_page_preview=self.disable_web_page_preview,
+            disable_notification=self.disable_notification,
+            reply_to_message_id=self.reply_to_message_id,
+            allow_sending_without_reply=self.allow_sending_without_reply,
+            reply_markup=self.reply_markup,
+        )
+        kwargs.update(payload)
+        return await self.bot.send_message(chat_id=chat_id, **kwargs)
@@ -1,11 +1,16 @@
 from string import Template
-from typing import Dict, List, Union
+from typing import AsyncIterable, Dict, Iterable, List, Union
 
 from aiogram.types import (ForceReply, InlineKeyboardMarkup,
                            ReplyKeyboardMarkup, ReplyKeyboardRemove)
 
 ChatIdType = Union[int, str]
-ChatsType = Union[Union[List[ChatIdType], ChatIdType], List[Dict]]
+ChatsType = Union[
+    Union[List[ChatIdType], ChatIdType],
+    List[Dict],
+    Iterable[Union[ChatIdType, Dict]],
+    AsyncIterable[Union[ChatIdType, Dict]],
+]
 TextType = Union[Template, str]
 MarkupType = Union[
     InlineKeyboardMarkup,
@@ -0,0 +1,133 @@
+import abc
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+Partition = List
+Results = Tuple[List[Dict], List[Dict]]
+
+
+class BaseWorkQueue(abc.ABC):
+    """
+    Queue of chat partitions shared by the coordinator and the workers
+    of a :class:`PartitionedBroadcaster`, possibly running on other nodes.
+    Methods are blocking and are called from an executor
+    """
+
+    @abc.abstractmethod
+    def put(self, partition: Partition) -> int:
+        pass
+
+    @abc.abstractmethod
+    def claim(self) -> Optional[Tuple[int, Partition]]:
+        pass
+
+    @abc.abstractmethod
+    def complete(self, partition_id: int, successful: List[Dict], failure: List[Dict]) -> None:
+        pass
+
+    @abc.abstractmethod
+    def unfinished(self) -> int:
+        pass
+
+    @abc.abstractmethod
+    def results(self) -> Results:
+        pass
+
+
+class SQLiteWorkQueue(BaseWorkQueue):
+    """
+    Work queue stored in an SQLite file, usable by every process that can
+    open the file. A claimed partition whose worker has not completed it
+    within ``lease_timeout`` seconds is handed out again.
+    Chats have to be JSON serializable.
+    """
+
+    def __init__(self, path: str, name: str = 'default', lease_timeout: float = 600.0):
+        self.path = path
+        self.name = name
+        self.lease_timeout = lease_timeout
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_connection'], state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False,
+            )
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS partitions ('
+                'id INTEGER PRIMARY KEY, name TEXT NOT NULL, chats TEXT NOT NULL, '
+                'claimed_at REAL, done INTEGER NOT NULL DEFAULT 0, '
+                'successful TEXT, failure TEXT)'
+            )
+        return self._connection
+
+    def put(self, partition: Partition) -> int:
+        with self._lock:
+            cursor = self._connect().execute(
+                'INSERT INTO partitions (name, chats) VALUES (?, ?)',
+                (self.name, json.dumps(partition)),
+            )
+            return cursor.lastrowid
+
+    def claim(self) -> Optional[Tuple[int, Partition]]:
+        with self._lock:
+            connection = self._connect()
+            now = time.time()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = connection.execute(
+                    'SELECT id, chats FROM partitions '
+                    'WHERE name = ? AND done = 0 AND (claimed_at IS NULL OR claimed_at < ?) '
+                    'ORDER BY id LIMIT 1',
+                    (self.name, now - self.lease_timeout),
+                ).fetchone()
+                if row is not None:
+                    connection.execute('UPDATE partitions SET claimed_at = ? WHERE id = ?', (now, row[0]))
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def complete(self, partition_id: int, successful: List[Dict], failure: List[Dict]) -> None:
+        with self._lock:
+            self._connect().execute(
+                'UPDATE partitions SET done = 1, successful = ?, failure = ? WHERE id = ?',
+                (json.dumps(successful), json.dumps(failure), partition_id),
+            )
+
+    def unfinished(self) -> int:
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT COUNT(*) FROM partitions WHERE name = ? AND done = 0', (self.name,),
+            ).fetchone()
+        return row[0]
+
+    def results(self) -> Results:
+        successful, failure = [], []
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT successful, failure FROM partitions WHERE name = ? AND done = 1 ORDER BY id',
+                (self.name,),
+            ).fetchall()
+        for partition_successful, partition_failure in rows:
+            successful.extend(json.loads(partition_successful))
+            failure.extend(json.loads(partition_failure))
+        return successful, failure
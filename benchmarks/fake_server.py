@@ -0,0 +1,105 @@
+"""
+Local stand-in for the Telegram Bot API.
+
+Every method answers with a minimal message after a configurable latency;
+a configurable share of requests fails with 429 RetryAfter, "bot was
+blocked by the user" or "chat not found".
+
+    $ python -m benchmarks.fake_server --port 8081 --latency 0.05 --retry-after-rate 0.01
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from typing import NamedTuple
+
+from aiohttp import web
+
+
+class ServerConfig(NamedTuple):
+    latency: float = 0.05
+    jitter: float = 0.01
+    retry_after_rate: float = 0.0
+    retry_after: int = 1
+    blocked_rate: float = 0.0
+    not_found_rate: float = 0.0
+    seed: int = 0
+
+
+def _error(status: int, description: str, **parameters) -> web.Response:
+    body = {'ok': False, 'error_code': status, 'description': description}
+    if parameters:
+        body['parameters'] = parameters
+    return web.json_response(body, status=status)
+
+
+def make_app(config: ServerConfig) -> web.Application:
+    rng = random.Random(config.seed)
+    message_ids = itertools.count(1)
+
+    async def handle(request: web.Request) -> web.Response:
+        if request.content_type == 'application/json':
+            data = await request.json()
+        else:
+            data = await request.post()
+        latency = max(0.0, rng.gauss(config.latency, config.jitter)) if config.jitter else config.latency
+        if latency:
+            await asyncio.sleep(latency)
+
+        roll = rng.random()
+        if roll < config.retry_after_rate:
+            return _error(
+                429, f'Too Many Requests: retry after {config.retry_after}', retry_after=config.retry_after,
+            )
+        roll -= config.retry_after_rate
+        if roll < config.blocked_rate:
+            return _error(403, 'Forbidden: bot was blocked by the user')
+        roll -= config.blocked_rate
+        if roll < config.not_found_rate:
+            return _error(400, 'Bad Request: chat not found')
+
+        chat_id = data.get('chat_id', 0)
+        chat_id = int(chat_id) if str(chat_id).lstrip('-').isdigit() else 0
+        return web.json_response({'ok': True, 'result': {
+            'message_id': next(message_ids),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': data.get('text') or '',
+        }})
+
+    app = web.Application()
+    app.router.add_route('POST', '/bot{token}/{method}', handle)
+    app.router.add_route('GET', '/bot{token}/{method}', handle)
+    return app
+
+
+def serve(host: str, port: int, config: ServerConfig) -> None:
+    web.run_app(make_app(config), host=host, port=port, print=None, access_log=None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=ServerConfig.latency)
+    parser.add_argument('--jitter', type=float, default=ServerConfig.jitter)
+    parser.add_argument('--retry-after-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--blocked-rate', type=float, default=0.0)
+    parser.add_argument('--not-found-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    serve(args.host, args.port, ServerConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        retry_after_rate=args.retry_after_rate,
+        retry_after=args.retry_after,
+        blocked_rate=args.blocked_rate,
+        not_found_rate=args.not_found_rate,
+        seed=args.seed,
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Throughput benchmark of the broadcasters against the local fake Bot API.
+
+The fake server runs in a separate process, so CPU time and memory are
+those of the broadcaster alone.
+
+    $ python -m benchmarks.run --chats 100000 --concurrency 64
+    $ python -m benchmarks.run --broadcaster message --chats 10000 --retry-after-rate 0.001 --rate 30
+"""
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import socket
+import sys
+import time
+from array import array
+from typing import Dict
+
+from aiogram import Bot
+from aiogram.bot.api import TelegramAPIServer
+from aiogram.types import Message
+
+from aiogram_broadcaster import BroadcastObserver, MessageBroadcaster, RateLimiter, TextBroadcaster
+from aiogram_broadcaster.session import close_session
+
+from .fake_server import ServerConfig, serve
+
+TOKEN = '42:benchmark'
+TEXT = 'Hello, <b>$name</b>! Your id is <code>$chat_id</code>'
+
+
+class LatencyRecorder(BroadcastObserver):
+    def __init__(self):
+        self.latencies = array('d')
+        self.retry_after = 0
+
+    def on_sent(self, broadcaster, chat_id, latency):
+        self.latencies.append(latency)
+
+    def on_failed(self, broadcaster, chat_id, error, latency):
+        self.latencies.append(latency)
+
+    def on_retry_after(self, broadcaster, chat_id, timeout):
+        self.retry_after += 1
+
+    def percentile(self, share: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def _wait_for_port(host: str, port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex((host, port)) == 0:
+                return
+        time.sleep(0.05)
+    raise RuntimeError(f'Fake Bot API did not start on {host}:{port}')
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+async def benchmark(args: argparse.Namespace) -> Dict:
+    bot = Bot(
+        token=TOKEN,
+        connections_limit=max(args.concurrency, 1),
+        server=TelegramAPIServer.from_base(f'http://{args.host}:{args.port}'),
+    )
+    Bot.set_current(bot)
+    rate_limiter = RateLimiter(rate=args.rate or None, chat_rate=None, group_rate=None)
+    recorder = LatencyRecorder()
+    chats = [{'chat_id': chat_id, 'name': f'user{chat_id}'} for chat_id in range(1, args.chats + 1)]
+
+    setup_started = time.perf_counter()
+    if args.broadcaster == 'text':
+        broadcaster = TextBroadcaster(
+            chats, TEXT, parse_mode='HTML', bot=bot, concurrency=args.concurrency,
+            rate_limiter=rate_limiter, observers=[recorder], logger='benchmark',
+        )
+    else:
+        message = Message.to_object({
+            'message_id': 1, 'date': 0, 'chat': {'id': 1, 'type': 'private'}, 'text': TEXT,
+        })
+        broadcaster = MessageBroadcaster(
+            chats, message, bot=bot, concurrency=args.concurrency,
+            rate_limiter=rate_limiter, observers=[recorder], logger='benchmark',
+        )
+    setup_time = time.perf_counter() - setup_started
+
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    try:
+        await broadcaster.run()
+    finally:
+        await close_session(bot)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    return {
+        'chats': args.chats,
+        'failed': len(broadcaster.get_failure(id_only=True)),
+        'setup_seconds': setup_time,
+        'elapsed_seconds': elapsed,
+        'messages_per_second': args.chats / elapsed if elapsed else 0.0,
+        'latency_p50_ms': recorder.percentile(0.5) * 1000,
+        'latency_p99_ms': recorder.percentile(0.99) * 1000,
+        'retry_after': recorder.retry_after,
+        'cpu_per_message_us': cpu / args.chats * 1e6 if args.chats else 0.0,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--broadcaster', choices=('text', 'message'), default='text')
+    parser.add_argument('--chats', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--rate', type=float, default=0, help='global messages per second, 0 disables the limit')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--retry-after-rate', type=float, default=0.0)
+    parser.add_argument('--blocked-rate', type=float, default=0.0)
+    parser.add_argument('--not-found-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = ServerConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        retry_after_rate=args.retry_after_rate,
+        blocked_rate=args.blocked_rate,
+        not_found_rate=args.not_found_rate,
+    )
+    server = multiprocessing.Process(target=serve, args=(args.host, args.port, config), daemon=True)
+    server.start()
+    try:
+        _wait_for_port(args.host, args.port)
+        results = asyncio.run(benchmark(args))
+    finally:
+        server.terminate()
+        server.join()
+
+    width = max(map(len, results))
+    for key, value in results.items():
+        print(f'{key:<{width}}  {value:.2f}' if isinstance(value, float) else f'{key:<{width}}  {value}')
+
+
+if __name__ == '__main__':
+    main()
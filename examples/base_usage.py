@@ -5,11 +5,9 @@ import logging
 
 
 async def main():
-    broadcaster = TextBroadcaster('USERS IDS HERE', 'hello!', bot_token='BOT TOKEN HERE')
-    try:
+    # The session of a bot created from a token is closed when the block exits
+    async with TextBroadcaster('USERS IDS HERE', 'hello!', bot_token='BOT TOKEN HERE') as broadcaster:
         await broadcaster.run()
-    finally:
-        await broadcaster.close_bot()
 
 
 if __name__ == '__main__':
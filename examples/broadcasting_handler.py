@@ -1,6 +1,6 @@
 from aiogram import Bot, Dispatcher, types
 
-from aiogram_broadcaster import MessageBroadcaster
+from aiogram_broadcaster import MessageBroadcaster, shutdown_broadcasts
 
 import asyncio
 import logging
@@ -10,8 +10,9 @@ async def message_handler(msg: types.Message):
     """
     The broadcaster will flood to a user whenever it receives a message
     """
-    users = [msg.from_user.id] * 5  # Your users list
-    await MessageBroadcaster(users, msg).run()  # run mailing
+    users = [msg.from_user.id] * 5  # Your users list, repeated ids are dropped unless duplicates=None
+    handle = MessageBroadcaster(users, msg, duplicates=None).start()  # run mailing in the background
+    await msg.answer(f'Broadcast {handle.id} started')  # the handler returns right away
 
 
 async def main():
@@ -22,6 +23,8 @@ async def main():
     try:
         await dp.start_polling()
     finally:
+        # Let running broadcasts finish their sends in flight, then close the session
+        await shutdown_broadcasts(timeout=30)
         await bot.session.close()
 
 